@@ -0,0 +1,18 @@
+# graded sudoku corpus: (name, grade, puzzle as 81 digits read row by row, 0 for empty cells)
+PUZZLES = [
+    # the example puzzle of the Wikipedia article on sudoku
+    ("wikipedia", "easy",
+     "530070000600195000098000000800060003400803001700020006060000280000419005000080079"),
+    # grid 01 of Project Euler problem 96
+    ("euler-01", "medium",
+     "003020600900305001001806400008102900700000008006708200002609500800203009005010300"),
+    # the first puzzle of Peter Norvig's "top95" collection of hard puzzles
+    ("norvig-top95-01", "hard",
+     "400000805030000000000700000020000060000080400000010000000603070500200000104000000"),
+    # Arto Inkala's 2012 "world's hardest sudoku"
+    ("inkala-2012", "hardest",
+     "800000000003600000070090200050007000000045700000100030001000068008500010090000400"),
+    # the first puzzle of Gordon Royle's collection of 17-clue puzzles (the fewest clues possible)
+    ("royle-17-0001", "17-clue",
+     "000000010400000000020000000000050407008000300001090000300400200050100000000806000"),
+]
@@ -0,0 +1,266 @@
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# the packages import their modules by their flat names
+sys.path.insert(0, os.path.join(ROOT, "enigma"))
+sys.path.insert(0, os.path.join(ROOT, "sudoku"))
+
+import numpy as np
+
+from enigma_machine import EnigmaMachine
+from puzzles import PUZZLES
+from sudoku import DEFAULT_TECHNIQUES, ENGINES, TECHNIQUES, sudoku_solver
+
+
+# every input is generated from this seed, so runs on different commits see the same data
+SEED = 1234
+
+ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+# (name, rotors, reflector, ring settings, initial positions)
+MACHINES = [
+    ("3-rotor", "I II III", "B", "04 11 23", "Q E V"),
+    ("4-rotor", "Beta IV II V", "A", "02 16 09 21", "M C K R"),
+]
+
+LEAD_COUNTS = [0, 10]
+
+MESSAGE_SIZES = [100, 1000, 10000]
+
+PATHS = ["object", "compiled"]
+
+# the sets of inference techniques the propagation engine is timed with
+TECHNIQUE_SETS = [("none", ())] + [(technique, (technique,)) for technique in TECHNIQUES] + [
+    ("default", DEFAULT_TECHNIQUES),
+    ("all", TECHNIQUES),
+]
+
+# results files from before a key was added are compared as if they had this value
+DEFAULTS = {"engine": "propagation", "techniques": "default"}
+
+
+def best_time(run, repeat):
+    """
+    Runs a function several times and returns its fastest run, in seconds. (float)
+
+    Parameters:
+        run: the function to time, called with no arguments (callable)
+        repeat: the number of runs (int)
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+
+def random_leads(rng, count):
+    """
+    Returns <count> plugboard pairs that do not share any letters. (list of str)
+
+    Parameters:
+        rng: the random number generator (random.Random)
+        count: the number of pairs (int)
+    """
+    letters = rng.sample(ALPHABET, 2 * count)
+    return [letters[2 * i] + letters[2 * i + 1] for i in range(count)]
+
+
+def enigma_benchmarks(repeat, sizes=MESSAGE_SIZES):
+    """
+    Measures how many characters per second EnigmaMachine.encode handles, for 3 and 4
+    rotor machines with 0 and 10 plugboard leads, for several message sizes.
+
+    Parameters:
+        repeat: the number of runs each measurement takes the fastest of (int)
+        sizes: the message sizes, in characters (list of int)
+    Returns: one result per measurement (list of dict)
+    """
+    rng = random.Random(SEED)
+    results = []
+
+    for name, rotors, reflector, ring_settings, initial_positions in MACHINES:
+        for lead_count in LEAD_COUNTS:
+            leads = random_leads(rng, lead_count)
+
+            for size in sizes:
+                message = "".join(rng.choice(ALPHABET) for _ in range(size))
+
+                for path in PATHS:
+                    machine = EnigmaMachine(rotors, reflector, ring_settings, initial_positions,
+                                            leads, compiled=(path == "compiled"))
+
+                    def run():
+                        # every run encodes the message from the start key
+                        machine.reset()
+                        machine.encode(message)
+
+                    seconds = best_time(run, repeat)
+                    results.append({
+                        "machine": name,
+                        "leads": lead_count,
+                        "size": size,
+                        "path": path,
+                        "seconds": seconds,
+                        "chars_per_second": size / seconds,
+                    })
+
+    return results
+
+
+def check_solution(puzzle, solution):
+    """
+    Checks that a solution is a completed, valid grid that agrees with the puzzle's clues. (bool)
+
+    Parameters:
+        puzzle: the puzzle (9x9 numpy array)
+        solution: the solver's answer (9x9 numpy array)
+    """
+    digits = list(range(1, 10))
+    rows = all(sorted(row) == digits for row in solution.tolist())
+    columns = all(sorted(column) == digits for column in solution.T.tolist())
+    boxes = all(sorted(solution[i:i + 3, j:j + 3].flatten().tolist()) == digits
+                for i in range(0, 9, 3) for j in range(0, 9, 3))
+    clues = bool(((puzzle == 0) | (puzzle == solution)).all())
+
+    return rows and columns and boxes and clues
+
+
+def sudoku_benchmarks(repeat, grades=None):
+    """
+    Measures how long sudoku_solver takes on each puzzle of the graded corpus, and how many
+    search nodes it visits, with each engine (and each set of inference techniques for the
+    propagation engine), and checks every answer.
+
+    Parameters:
+        repeat: the number of runs each measurement takes the fastest of (int)
+        grades: the grades to run, default is all of them (list of str)
+    Returns: one result per puzzle (list of dict)
+    """
+    results = []
+
+    for name, grade, digits in PUZZLES:
+        if grades is not None and grade not in grades:
+            continue
+
+        puzzle = np.array([int(digit) for digit in digits]).reshape(9, 9)
+
+        configurations = [("propagation", label, techniques) for label, techniques in TECHNIQUE_SETS]
+        # the other engines do not use the techniques
+        configurations += [(engine, "default", DEFAULT_TECHNIQUES) for engine in ENGINES if engine != "propagation"]
+
+        for engine, label, techniques in configurations:
+            solutions = []
+            stats = {}
+
+            def run():
+                # the solver is given a copy, in case it changes its input
+                stats.clear()
+                solutions.append(sudoku_solver(puzzle.copy(), engine, techniques, stats))
+
+            seconds = best_time(run, repeat)
+            results.append({
+                "puzzle": name,
+                "grade": grade,
+                "engine": engine,
+                "techniques": label,
+                "clues": int((puzzle != 0).sum()),
+                "seconds": seconds,
+                "nodes": stats["nodes"],
+                "solved": check_solution(puzzle, np.asarray(solutions[-1])),
+            })
+
+    return results
+
+
+def metadata():
+    """
+    Returns a description of the environment the benchmarks ran in. (dict)
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "seed": SEED,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def compare(baseline, current):
+    """
+    Prints how each measurement changed between two sets of results
+    (a ratio above 1 means the current results are faster).
+
+    Parameters:
+        baseline: results loaded from an earlier run (dict)
+        current: the results of this run (dict)
+    Returns: None
+    """
+    for suite, keys in (("enigma", ("machine", "leads", "size", "path")), ("sudoku", ("puzzle", "engine", "techniques"))):
+        before = {tuple(result.get(key, DEFAULTS.get(key)) for key in keys): result
+                  for result in baseline.get(suite, [])}
+
+        for result in current.get(suite, []):
+            key = tuple(result[key] for key in keys)
+            if key in before:
+                speedup = before[key]["seconds"] / result["seconds"]
+                print(f"{suite} {' '.join(str(part) for part in key)}: {speedup:.2f}x", file=sys.stderr)
+
+
+def main(argv=None):
+    """
+    Entry point: python benchmarks/run.py [--suite {enigma,sudoku,all}] [--output FILE]
+
+    Parameters:
+        argv: the arguments, default is sys.argv[1:] (list of str)
+    Returns: None
+    """
+    parser = argparse.ArgumentParser(description="Runs the enigma and sudoku benchmarks and prints JSON.")
+    parser.add_argument("--suite", choices=["enigma", "sudoku", "all"], default="all")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="the number of runs each measurement takes the fastest of (default: 3)")
+    parser.add_argument("--quick", action="store_true",
+                        help="skip the largest messages and the two hardest sudoku grades")
+    parser.add_argument("--output", default=None, help="write the results to this file instead of stdout")
+    parser.add_argument("--compare", default=None, help="a results file from an earlier run to compare against")
+    arguments = parser.parse_args(argv)
+
+    results = {"meta": metadata()}
+    if arguments.suite in ("enigma", "all"):
+        sizes = MESSAGE_SIZES[:-1] if arguments.quick else MESSAGE_SIZES
+        results["enigma"] = enigma_benchmarks(arguments.repeat, sizes)
+    if arguments.suite in ("sudoku", "all"):
+        grades = ["easy", "medium", "hard"] if arguments.quick else None
+        results["sudoku"] = sudoku_benchmarks(arguments.repeat, grades)
+
+    text = json.dumps(results, indent=2)
+    if arguments.output is None:
+        print(text)
+    else:
+        with open(arguments.output, "w") as file:
+            file.write(text + "\n")
+
+    if arguments.compare is not None:
+        with open(arguments.compare) as file:
+            compare(json.load(file), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import argparse
+import mmap
+import os
+import sys
+import time
+
+# the modules of the package import each other by their flat names
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from enigma_machine import EnigmaMachine
+
+
+# the number of bytes encoded (and written) at a time
+CHUNK_SIZE = 1 << 22
+
+
+def parse_arguments(argv=None):
+    """
+    Parses the command line arguments.
+
+    Parameters:
+        argv: the arguments, default is sys.argv[1:] (list of str)
+    Returns: the parsed arguments (argparse.Namespace)
+    """
+    parser = argparse.ArgumentParser(prog="python -m enigma",
+                                     description="Encodes (or decodes) a file with an enigma machine.")
+    parser.add_argument("input", help="the file to encode")
+    parser.add_argument("output", help="the file the result is written to")
+    parser.add_argument("--rotors", required=True, help='rotors, left to right, e.g. "I II III"')
+    parser.add_argument("--reflector", required=True, help='the reflector, e.g. "B"')
+    parser.add_argument("--rings", required=True, help='ring settings, e.g. "01 01 01"')
+    parser.add_argument("--positions", required=True, help='initial positions, e.g. "A A A"')
+    parser.add_argument("--plugs", default="", help='plugboard pairs, e.g. "AB CD"')
+    parser.add_argument("--non-letters", choices=["pass", "drop", "error"], default="pass",
+                        help="what to do with bytes that are not letters (default: pass); "
+                             "with error, the output is incomplete if the input contains any")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
+                        help="the number of bytes encoded at a time (default: %(default)s)")
+    parser.add_argument("--quiet", action="store_true", help="do not report the throughput")
+
+    return parser.parse_args(argv)
+
+
+def encode_file(machine, input_path, output_path, non_letters="pass", chunk_size=CHUNK_SIZE):
+    """
+    Encodes a file without loading it into memory: the input is memory-mapped and encoded
+    one chunk at a time into a reusable buffer, which is written to the output.
+
+    Parameters:
+        machine: the enigma machine to encode with (EnigmaMachine)
+        input_path: the path of the file to encode (str)
+        output_path: the path of the file the result is written to (str)
+        non_letters: what to do with bytes that are not letters, see EnigmaMachine.encode_into (str)
+        chunk_size: the number of bytes encoded at a time (int)
+    Returns: the number of bytes read and the number of bytes written (tuple)
+    """
+    if chunk_size < 1:
+        raise ValueError("Chunk size must be positive.")
+
+    buffer = bytearray(chunk_size)
+    read = 0
+    written = 0
+
+    with open(input_path, "rb") as reader, open(output_path, "wb") as writer:
+        size = os.fstat(reader.fileno()).st_size
+        # empty files cannot be memory-mapped
+        if size == 0:
+            return 0, 0
+
+        source = mmap.mmap(reader.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(source)
+        output = memoryview(buffer)
+
+        for start in range(0, size, chunk_size):
+            count = machine.encode_into(view[start:start + chunk_size], buffer, non_letters)
+            writer.write(output[:count])
+
+            read += min(chunk_size, size - start)
+            written += count
+
+        # the map is only closed here: if encoding fails, the traceback still holds views
+        # of it, and it is closed once they are freed
+        view.release()
+        source.close()
+
+    return read, written
+
+
+def main(argv=None):
+    """
+    Entry point of the command line tool.
+
+    Parameters:
+        argv: the arguments, default is sys.argv[1:] (list of str)
+    Returns: the exit status (int)
+    """
+    arguments = parse_arguments(argv)
+
+    try:
+        machine = EnigmaMachine(arguments.rotors, arguments.reflector, arguments.rings,
+                                arguments.positions, arguments.plugs.split())
+        start = time.perf_counter()
+        read, written = encode_file(machine, arguments.input, arguments.output,
+                                    arguments.non_letters, arguments.chunk_size)
+        elapsed = time.perf_counter() - start
+    except (TypeError, ValueError, KeyError, OSError) as error:
+        # a KeyError would otherwise be printed with quotes around its message
+        message = error.args[0] if isinstance(error, KeyError) else error
+        print(f"error: {message}", file=sys.stderr)
+        return 1
+
+    if not arguments.quiet:
+        throughput = read / elapsed / 1e6 if elapsed > 0 else float("inf")
+        print(f"encoded {read} bytes ({written} written) in {elapsed:.3f} s: {throughput:.2f} MB/s",
+              file=sys.stderr)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,288 @@
+import numpy as np
+
+from bulk_encoder import NO_NOTCH, step_sequence
+from enigma_machine import rotor_from_name
+from plugboard import Plugboard
+from registry import intern_wiring
+from rotor import Rotor
+
+
+# every machine is given 4 rotor slots (right to left); machines with 3 rotors
+# get a fixed identity rotor in the 4th slot, which never rotates (like a 4th rotor)
+SLOTS = 4
+
+IDENTITY = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+# the number of messages encoded together (messages are grouped by length)
+GROUP_SIZE = 4096
+
+# the number of letters (messages x key presses) encoded with one set of array operations;
+# the messages of a group are encoded this many letters at a time
+GROUP_LETTERS = 1 << 20
+
+
+class WiringTables:
+    """
+    Defines:
+        - the lookup tables of a batch's wirings stacked into NumPy arrays, one row for each
+        distinct wiring, shared by all the machines that use it. The rows are gathered
+        from the wirings' tables in the registry (see registry.WiringData), so that a
+        batch can index every wiring at once
+        - methods that look up the rows of rotors and wirings
+    """
+
+    def __init__(self):
+        """
+        Constructor. Creates a set of tables containing only the identity wiring.
+        """
+        # wiring (str) --> row in the stacked tables
+        self.rows = {}
+        # rotor name --> (row, notch index or None)
+        self.rotors = {}
+
+        self.forward_rows = []
+        self.backward_rows = []
+        self.stacked = None
+
+        self.row(IDENTITY)
+
+
+    def row(self, wiring):
+        """
+        Returns the row of the tables that belongs to a wiring, compiling it if it is new. (int)
+
+        Parameters:
+            wiring: the wiring (str or list of str)
+        """
+        wiring = "".join(wiring)
+
+        if wiring not in self.rows:
+            self.rows[wiring] = len(self.forward_rows)
+            forward, backward = intern_wiring(wiring).shift_arrays()
+            self.forward_rows.append(forward)
+            self.backward_rows.append(backward)
+            self.stacked = None
+
+        return self.rows[wiring]
+
+
+    def rotor(self, name):
+        """
+        Returns the row and the notch (alphabetical index, or None) of a rotor. (tuple)
+
+        Parameters:
+            name: the name of the rotor (str)
+        """
+        key = name.upper() if isinstance(name, str) else name
+
+        if key not in self.rotors:
+            # a rotor object is only built the first time a name is seen
+            rotor = rotor_from_name(name)
+            notch = ord(rotor.notch) % 65 if rotor.has_notch() else None
+            self.rotors[key] = (self.row(rotor.wiring), notch)
+
+        return self.rotors[key]
+
+
+    def arrays(self):
+        """
+        Returns the stacked forward and backward tables, with shape (wirings, 27, 26). (tuple)
+        """
+        if self.stacked is None:
+            self.stacked = (np.stack(self.forward_rows), np.stack(self.backward_rows))
+
+        return self.stacked
+
+
+# tables shared by every batch
+TABLES = WiringTables()
+
+
+def parse_config(config, tables=TABLES):
+    """
+    Turns a machine configuration into the integer values the batch encoder works with,
+    without building an EnigmaMachine.
+
+    Parameters:
+        config: rotors, reflector, ring settings, initial positions and (optionally)
+                plugboard pairs, as given to create_enigma_machine (tuple)
+        tables: the tables the wirings are interned in (WiringTables)
+    Returns: table rows, starting positions and turns until notch of the rotor slots
+             (right to left), the reflector's row and the plugboard table (tuple)
+    """
+    rotors, reflector, ring_settings, initial_positions = config[:4]
+    plugboard_pairs = config[4] if len(config) > 4 else []
+
+    if not all(isinstance(arg, str) for arg in [rotors, ring_settings, initial_positions]):
+        raise TypeError("Rotors, reflector, ring settings, and initial positions must be strings.")
+
+    rotors_list = rotors.split()
+    ring_settings_list = ring_settings.split()
+    initial_positions_list = initial_positions.split()
+
+    if not (len(rotors_list) == len(ring_settings_list) == len(initial_positions_list)):
+        raise ValueError("You have not provided a consistent number of rotors, ring settings, and initial positions.")
+    if not 3 <= len(rotors_list) <= SLOTS:
+        raise ValueError("A machine must have 3 or 4 rotors.")
+
+    rows = [tables.row(IDENTITY)] * SLOTS
+    positions = [0] * SLOTS
+    turns = [NO_NOTCH] * SLOTS
+
+    # right to left
+    settings = zip(reversed(rotors_list), reversed(ring_settings_list), reversed(initial_positions_list))
+    for slot, (name, ring_setting, initial_position) in enumerate(settings):
+        rows[slot], notch = tables.rotor(name)
+
+        if len(initial_position) != 1 or not 65 <= ord(initial_position) <= 90:
+            raise ValueError("Invalid initial position.")
+        if not ring_setting.isdigit() or not 1 <= int(ring_setting) <= 26:
+            raise ValueError("Invalid ring setting.")
+
+        # same rules as Rotor.set_position and Rotor.set_turns_until_notch
+        initial_position = ord(initial_position) % 65
+        position = initial_position - (int(ring_setting) - 1)
+        positions[slot] = position if position > 0 else 26 + position
+
+        if notch is not None:
+            if initial_position < notch:
+                turns[slot] = notch - initial_position + 1
+            else:
+                turns[slot] = (26 - initial_position) + notch + 1
+
+    if isinstance(reflector, Rotor):
+        reflector_row = tables.row(reflector.wiring)
+    else:
+        reflector_row, _ = tables.rotor(reflector)
+
+    if not isinstance(plugboard_pairs, list):
+        raise TypeError("Plugboard pairs must be a list.")
+    if len(plugboard_pairs) > Plugboard.MAX_LEADS:
+        raise ValueError("Cannot add any more leads to the plugboard.")
+
+    # leads are applied one after the other, as in EnigmaMachine.run_through_leads
+    plugboard = list(range(26))
+    for pair in plugboard_pairs:
+        if not isinstance(pair, str):
+            raise TypeError("Plugboard pairs must be strings.")
+        if len(pair) != 2 or not pair.isalpha() or not pair.isascii():
+            raise ValueError("Plugboard pairs must be pairs of two letters.")
+
+        first, second = ord(pair[0].upper()) - 65, ord(pair[1].upper()) - 65
+        if first == second:
+            raise ValueError("You cannot map a character to itself.")
+
+        for i in range(26):
+            if plugboard[i] == first:
+                plugboard[i] = second
+            elif plugboard[i] == second:
+                plugboard[i] = first
+
+    return rows, positions, turns, reflector_row, plugboard
+
+
+def encode_batch(jobs, tables=TABLES):
+    """
+    Encodes many messages, each with its own machine configuration, together.
+
+    Each message is encoded from the start of its key, as a freshly created machine would
+    encode it. Messages are grouped by length, and every group is encoded with array
+    operations over a stacked (machines x rotors) state, at most GROUP_LETTERS letters at a time.
+
+    Parameters:
+        jobs: (config, message) pairs, where config is given as for parse_config and
+              message only contains letters (iterable)
+        tables: the tables the wirings are interned in (WiringTables)
+    Returns: the encoded messages, in the order of the jobs (list of str)
+    """
+    parsed = []
+    messages = []
+    for config, message in jobs:
+        if not isinstance(message, str):
+            raise TypeError("Messages must be strings.")
+
+        # in case non capital letters are given
+        message = message.upper()
+        if not (message.isalpha() and message.isascii()) and message:
+            raise ValueError("Messages must only contain letters.")
+
+        parsed.append(parse_config(config, tables))
+        messages.append(message)
+
+    forward, backward = tables.arrays()
+    results = [None] * len(messages)
+
+    order = sorted(range(len(messages)), key=lambda i: len(messages[i]))
+    for start in range(0, len(order), GROUP_SIZE):
+        group = order[start:start + GROUP_SIZE]
+        encoded = encode_group([parsed[i] for i in group], [messages[i] for i in group], forward, backward)
+
+        for i, message in zip(group, encoded):
+            results[i] = message
+
+    return results
+
+
+def encode_group(parsed, messages, forward, backward):
+    """
+    Encodes a group of messages with array operations over the whole group. The messages
+    are encoded in blocks of key presses, carrying the rotor state from one block to the
+    next, so that at most GROUP_LETTERS letters are handled at once however long the
+    messages are, and the messages that have ended are left out of the later blocks.
+
+    Parameters:
+        parsed: the parsed configuration of each message (list of tuples, see parse_config)
+        messages: the messages, in capital letters (list of str)
+        forward: the stacked right to left tables (numpy array)
+        backward: the stacked left to right tables (numpy array)
+    Returns: the encoded messages (list of str)
+    """
+    # shortest first, so that the messages still going on are always the last ones
+    order = sorted(range(len(messages)), key=lambda i: len(messages[i]))
+    messages = [messages[i] for i in order]
+    parsed = [parsed[i] for i in order]
+    lengths = [len(message) for message in messages]
+
+    rows = np.array([config[0] for config in parsed])
+    positions = np.array([config[1] for config in parsed])
+    turns = np.array([config[2] for config in parsed])
+    reflectors = forward[np.array([config[3] for config in parsed]), 0]
+    plugboards = np.array([config[4] for config in parsed])
+
+    pieces = [[] for _ in messages]
+    first = 0
+    start = 0
+    while start < lengths[-1]:
+        # leave out the messages that have ended
+        while lengths[first] <= start:
+            first += 1
+        stop = start + min(max(1, GROUP_LETTERS // (len(messages) - first)), lengths[-1] - start)
+
+        # pad the messages that end within the block; the padding is encoded and thrown away
+        codes = np.zeros((len(messages) - first, stop - start), dtype=np.int64)
+        for i, message in enumerate(messages[first:]):
+            block = message[start:stop]
+            codes[i, :len(block)] = np.frombuffer(block.encode("ascii"), dtype=np.uint8) - 65
+
+        offsets, positions[first:], turns[first:] = step_sequence(positions[first:], turns[first:], stop - start)
+
+        group_rows = rows[first:]
+        result = np.take_along_axis(plugboards[first:], codes, axis=1)
+        for slot in range(SLOTS):
+            result = forward[group_rows[:, slot, None], offsets[slot], result]
+        result = np.take_along_axis(reflectors[first:], result, axis=1)
+        for slot in reversed(range(SLOTS)):
+            result = backward[group_rows[:, slot, None], offsets[slot], result]
+        result = np.take_along_axis(plugboards[first:], result, axis=1)
+
+        letters = (result + 65).astype(np.uint8)
+        for i in range(first, len(messages)):
+            pieces[i].append(letters[i - first, :min(lengths[i], stop) - start].tobytes().decode("ascii"))
+
+        start = stop
+
+    encoded = [None] * len(messages)
+    for i, message_pieces in zip(order, pieces):
+        encoded[i] = "".join(message_pieces)
+
+    return encoded
@@ -0,0 +1,161 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from cryptanalysis import DecryptionCore
+from scoring import letters_to_codes
+
+
+class Menu:
+    """
+    Defines:
+        - the menu of a crib: a graph whose nodes are letters and whose edges join each
+        crib letter to the ciphertext letter it was encrypted to, labelled with its position
+        - the test letter the bombe feeds its current into, and the number of loops
+        (independent cycles) in the part of the menu connected to it
+    """
+
+    def __init__(self, ciphertext, crib, offset=0):
+        """
+        Constructor. Builds the menu of a crib.
+
+        Parameters:
+            ciphertext: the ciphertext (str)
+            crib: the plaintext that is believed to appear in the ciphertext (str)
+            offset: the position of the crib in the ciphertext, default is 0 (int)
+        """
+        if not (isinstance(ciphertext, str) and isinstance(crib, str)):
+            raise TypeError("Ciphertext and crib must be strings.")
+
+        ciphertext = letters_to_codes(ciphertext)
+        crib = letters_to_codes(crib)
+
+        if not 0 <= offset <= len(ciphertext) - len(crib):
+            raise ValueError("The crib does not fit in the ciphertext at this offset.")
+        if len(crib) == 0:
+            raise ValueError("The crib must contain at least one letter.")
+
+        # (crib letter, ciphertext letter, position in the message)
+        edges = []
+        for i, (plain, cipher) in enumerate(zip(crib, ciphertext[offset:])):
+            # the enigma never encrypts a letter to itself
+            if plain == cipher:
+                raise ValueError("The crib cannot be at this offset: a letter would encrypt to itself.")
+            edges.append((int(plain), int(cipher), offset + i))
+
+        # the test letter is the letter with the most connections
+        connections = np.zeros(26, dtype=np.int64)
+        for a, b, _ in edges:
+            connections[a] += 1
+            connections[b] += 1
+        self.test_letter = int(np.argmax(connections))
+
+        # only the part of the menu connected to the test letter affects the test register
+        component = {self.test_letter}
+        added = True
+        while added:
+            added = False
+            for a, b, _ in edges:
+                if (a in component) != (b in component):
+                    component.update((a, b))
+                    added = True
+
+        self.edges = [edge for edge in edges if edge[0] in component]
+        self.letters = sorted(component)
+        self.loops = len(self.edges) - len(self.letters) + 1
+
+
+def sweep(rotors, reflector, menu, guess=0):
+    """
+    Runs the bombe over every start position of one wheel order (ring settings 01).
+
+    For each start position, current is fed into the test register at the hypothesis
+    "the test letter is steckered to <guess>", and spread through the menu: if X is
+    steckered to Y, the letter joined to X at position i is steckered to the scrambler's
+    output for Y at position i; and if X is steckered to Y, Y is steckered to X (the
+    diagonal board). Every start position whose test register does not light up
+    completely is a stop.
+
+    Parameters:
+        rotors: the names of the rotors, left to right (sequence of str)
+        reflector: the name of the reflector (str)
+        menu: the menu (Menu)
+        guess: the alphabetical index of the hypothesised stecker of the test letter (int)
+    Returns: the stops as (rotors, initial positions, stecker of the test letter or None) tuples (list)
+    """
+    initial_positions = np.indices((26,) * len(rotors)).reshape(len(rotors), -1).T
+    ring_settings = np.zeros(len(rotors), dtype=np.int64)
+
+    core = DecryptionCore(rotors, reflector)
+    scramblers = core.scramblers_at(initial_positions, ring_settings, [position for _, _, position in menu.edges])
+    scramblers = [scramblers[:, i] for i in range(len(menu.edges))]
+
+    test = menu.test_letter
+    live = np.zeros((len(initial_positions), 26, 26), dtype=bool)
+    live[:, test, guess] = True
+    live[:, guess, test] = True
+
+    # start positions whose test register is still changing
+    active = np.arange(len(initial_positions))
+    while active.size:
+        current = live[active]
+        before = current.copy()
+
+        for edge, (a, b, _) in enumerate(menu.edges):
+            scrambler = scramblers[edge][active]
+            current[:, b] |= np.take_along_axis(current[:, a], scrambler, axis=1)
+            current[:, a] |= np.take_along_axis(current[:, b], scrambler, axis=1)
+        current |= current.transpose(0, 2, 1)
+
+        live[active] = current
+        changed = (current != before).any(axis=(1, 2))
+        saturated = current[:, test].all(axis=1)
+        active = active[changed & ~saturated]
+
+    lit = live[:, test].sum(axis=1)
+    stops = []
+    for i in np.nonzero(lit < 26)[0]:
+        if lit[i] == 1:
+            stecker = guess
+        elif lit[i] == 25:
+            stecker = int(np.nonzero(~live[i, test])[0][0])
+        else:
+            stecker = None
+
+        positions = " ".join(chr(65 + position) for position in initial_positions[i])
+        stops.append((" ".join(rotors), positions, None if stecker is None else chr(65 + stecker)))
+
+    return stops
+
+
+def run_bombe(ciphertext, crib, offset=0, reflector="B", rotors=("I", "II", "III", "IV", "V"), workers=1):
+    """
+    Runs the bombe over every wheel order (3 rotors out of the given ones) and start position.
+    Stops are candidate keys with ring settings 01 01 01; the rotors' offsets of the real key
+    are the same, unless the middle rotor turns over at a different point of the crib.
+
+    Parameters:
+        ciphertext: the ciphertext (str)
+        crib: the plaintext that is believed to appear in the ciphertext (str)
+        offset: the position of the crib in the ciphertext, default is 0 (int)
+        reflector: the name of the reflector, default is B (str)
+        rotors: the names of the rotors to choose from (sequence of str)
+        workers: the number of processes the wheel orders are spread across, default is 1;
+                 None means the number of CPUs (int)
+    Returns: the stops as (rotors, initial positions, stecker of the test letter or None) tuples (list)
+    """
+    menu = Menu(ciphertext, crib, offset)
+    orders = list(itertools.permutations(rotors, 3))
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers == 1:
+        results = [sweep(order, reflector, menu) for order in orders]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(sweep, orders, [reflector] * len(orders), [menu] * len(orders)))
+
+    return [stop for stops in results for stop in stops]
@@ -0,0 +1,269 @@
+import numpy as np
+
+from registry import intern_wiring
+
+
+# the number of characters whose rotor offsets are computed at once
+BLOCK_SIZE = 1 << 16
+
+# turns until notch of a rotor without a notch (None in Rotor objects)
+NO_NOTCH = -1
+
+# reduces the sum of two offsets (0-50) to an offset (0-25)
+WRAP = np.arange(52) % 26
+
+
+def array_tables(wiring):
+    """
+    Returns the right to left and left to right tables of a wiring as read-only NumPy arrays,
+    kept with the wiring in the registry (see registry.WiringData) and shared by every
+    encoder that uses it.
+
+    Parameters:
+        wiring: the wiring of the rotor (sequence of str)
+    Returns: the two tables, each with shape (27, 26) (tuple)
+    """
+    return intern_wiring(wiring).shift_arrays()
+
+
+def start_positions(initial_positions, ring_settings):
+    """
+    Computes the starting positions of rotors (same rules as Rotor.set_position).
+
+    Parameters:
+        initial_positions: initial positions as alphabetical indices, 0-25 (numpy array)
+        ring_settings: ring settings starting at 0, 0-25 (numpy array, broadcastable)
+    Returns: the starting positions, 1-26 (numpy array)
+    """
+    positions = np.asarray(initial_positions) - np.asarray(ring_settings)
+    return np.where(positions > 0, positions, 26 + positions)
+
+
+def start_turns(initial_positions, notch):
+    """
+    Computes the turns until rotors reach their notch (same rules as Rotor.set_turns_until_notch).
+
+    Parameters:
+        initial_positions: initial positions as alphabetical indices, 0-25 (numpy array)
+        notch: the alphabetical index of the notch, or None (int)
+    Returns: the turns until notch, NO_NOTCH for rotors without a notch (numpy array)
+    """
+    initial_positions = np.asarray(initial_positions)
+    if notch is None:
+        return np.full(initial_positions.shape, NO_NOTCH)
+
+    return np.where(initial_positions < notch, notch - initial_positions + 1,
+                    (26 - initial_positions) + notch + 1)
+
+
+def positions_after(positions, rotations):
+    """
+    Computes the positions of rotors after they have rotated a number of times
+    (same rules as Rotor.increase_position, applied <rotations> times).
+
+    Parameters:
+        positions: starting positions, 0-26 (numpy array)
+        rotations: number of rotations (numpy array, broadcastable with positions)
+    Returns: the positions after the rotations (numpy array)
+    """
+    # a rotor starting at position 26 stays on the same letter during its first rotation
+    moved = np.where(positions == 26, rotations - 1, positions + rotations) % 26
+    return np.where(rotations == 0, positions, moved)
+
+
+def turns_after(turns, rotations):
+    """
+    Computes the turns until notch of rotors after they have rotated a number of times
+    (same rules as Rotor.dec_turns_until_notch, applied <rotations> times).
+
+    Parameters:
+        turns: starting turns until notch, NO_NOTCH for rotors without a notch (numpy array)
+        rotations: number of rotations (numpy array, broadcastable with turns)
+    Returns: the turns until notch after the rotations (numpy array)
+    """
+    # rotations needed to first reach the notch (from 0 it takes a full revolution)
+    first = np.where(turns > 0, turns, 26)
+    counted = np.where(rotations < first, first - rotations, (first - rotations) % 26)
+    counted = np.where(rotations == 0, turns, counted)
+    return np.where(turns == NO_NOTCH, NO_NOTCH, counted)
+
+
+def step_sequence(positions, turns, length):
+    """
+    Computes the offset of every rotor at each of <length> key presses, without going
+    through the key presses one at a time (the closed form of EnigmaMachine.advance_state,
+    evaluated at every key press at once).
+
+    Parameters:
+        positions: starting positions, one row per machine, one column per rotor from
+                   right to left (numpy array, shape (machines, rotors))
+        turns: starting turns until notch, same layout (numpy array)
+        length: number of key presses (int)
+    Returns: the offsets (0-25) of each rotor at each key press (list of numpy arrays,
+             one per rotor, broadcastable to shape (machines, length)), and the positions
+             and turns until notch after the last key press (tuple)
+    """
+    machines, rotors = positions.shape
+    if length == 0:
+        return [positions[:, i, None] % 26 for i in range(rotors)], positions.copy(), turns.copy()
+
+    key_presses = np.arange(1, length + 1)
+
+    # the rotations of the 2nd and 3rd rotors only depend on the turns until notch of the
+    # two rightmost rotors, so they are computed once for each distinct pair (one row each)
+    pairs, machine_pair = np.unique(turns[:, :2], axis=0, return_inverse=True)
+    machine_pair = machine_pair.reshape(-1)
+    first_machine = np.zeros(machines, dtype=np.int64)
+
+    # 1st rotor: rotates on every key press
+    rotations = [(key_presses[None, :], first_machine)]
+
+    # 2nd rotor: once when the 1st rotor reaches its notch, then every 26 key presses
+    notched = pairs[:, 0, None] != NO_NOTCH
+    first_turnover = np.where(pairs[:, 0, None] > 0, pairs[:, 0, None], 26)
+    middle_rotations = np.where(notched & (key_presses >= first_turnover), (key_presses - first_turnover) // 26 + 1, 0)
+    rotations.append((middle_rotations, machine_pair))
+
+    # 3rd rotor: on every key press during which the 2nd rotor is at its notch
+    middle = pairs[:, 1, None]
+    at_notch = np.where(middle == 0, np.where(notched, np.minimum(key_presses, first_turnover - 1), key_presses), 0)
+    since = key_presses - (first_turnover + 26 * (np.where(middle > 0, middle, 26) - 1))
+    revolutions = since // 676
+    blocks = 26 * revolutions + np.minimum(26, since - 676 * revolutions + 1)
+    left_rotations = at_notch + np.where(notched & (middle != NO_NOTCH) & (since >= 0), blocks, 0)
+    rotations.append((left_rotations, machine_pair))
+
+    # 4th rotor: never rotates
+    rotations += [(np.zeros((1, 1), dtype=np.int64), first_machine)] * (rotors - 3)
+
+    offsets = []
+    final_positions = np.empty_like(positions)
+    final_turns = np.empty_like(turns)
+    for i, (rows, machine_row) in enumerate(rotations):
+        # a rotor starting at position 26 stays on the same letter during its first rotation,
+        # so each row is reduced twice: as it is, and one rotation behind
+        reduced = np.concatenate([rows % 26, np.maximum(rows - 1, 0) % 26])
+        from_26 = positions[:, i] == 26
+        offsets.append(WRAP[reduced[machine_row + from_26 * len(rows)] + positions[:, i, None] % 26])
+
+        final_positions[:, i] = positions_after(positions[:, i], rows[machine_row, -1])
+        final_turns[:, i] = turns_after(turns[:, i], rows[machine_row, -1])
+
+    return offsets, final_positions, final_turns
+
+
+class BulkEncoder:
+    """
+    Defines:
+        - NumPy versions of the lookup tables of an enigma machine
+        - methods that encode whole messages with array operations, computing the
+        rotor positions for every character ahead of time
+    """
+
+    def __init__(self, machine):
+        """
+        Constructor. Builds the lookup tables of the machine.
+
+        Parameters:
+            machine: the enigma machine to encode with (EnigmaMachine)
+        """
+        self.machine = machine
+
+        # the rotors in the order a character goes through them on its way in (right to left)
+        self.rotors = machine.rotors[::-1]
+
+        self.forward = [array_tables(rotor.wiring)[0] for rotor in self.rotors]
+        self.backward = [array_tables(rotor.wiring)[1] for rotor in self.rotors]
+        self.reflector = array_tables(machine.reflector.wiring)[0][machine.reflector.position]
+
+        self.compile_plugboard()
+
+
+    def clone(self, machine):
+        """
+        Returns a copy of the encoder that works on another machine's rotors, sharing its tables.
+        The other machine must have the same configuration (see EnigmaMachine.clone).
+
+        Parameters:
+            machine: the enigma machine the copy works on (EnigmaMachine)
+        Returns: the copy (BulkEncoder)
+        """
+        encoder = BulkEncoder.__new__(BulkEncoder)
+        encoder.machine = machine
+        encoder.rotors = machine.rotors[::-1]
+        encoder.forward = self.forward
+        encoder.backward = self.backward
+        encoder.reflector = self.reflector
+        encoder.plugboard = self.plugboard
+
+        return encoder
+
+
+    def compile_plugboard(self):
+        """
+        (Re)builds the plugboard table from the machine's leads.
+
+        Returns: None
+        """
+        plugboard = []
+        for i in range(26):
+            char = self.machine.run_through_leads(chr(65 + i))
+            if not 65 <= ord(char) <= 90:
+                raise ValueError("The bulk encoder only supports leads between letters (A-Z).")
+            plugboard.append(ord(char) - 65)
+
+        self.plugboard = np.array(plugboard)
+
+
+    def encode(self, codes):
+        """
+        Encodes a message given as alphabetical indices, and leaves the machine's
+        rotors in the state the scalar encode would.
+
+        Parameters:
+            codes: the alphabetical indices of the message's letters, 0-25 (numpy array)
+        Returns: the alphabetical indices of the encoded letters (numpy array)
+        """
+        codes = np.asarray(codes)
+        if codes.size and (codes.min() < 0 or codes.max() > 25):
+            raise ValueError("Letters must be given as alphabetical indices (0-25).")
+
+        result = np.empty(codes.shape, dtype=np.int64)
+        flat_codes = codes.reshape(-1)
+        flat_result = result.reshape(-1)
+
+        for start in range(0, flat_codes.size, BLOCK_SIZE):
+            block = flat_codes[start:start + BLOCK_SIZE]
+            flat_result[start:start + BLOCK_SIZE] = self.encode_block(block)
+
+        return result
+
+
+    def encode_block(self, codes):
+        """
+        Encodes a block of alphabetical indices, starting from the rotors' current state.
+
+        Parameters:
+            codes: the alphabetical indices to encode (1-dimensional numpy array)
+        Returns: the encoded alphabetical indices (numpy array)
+        """
+        positions = np.array([[rotor.position for rotor in self.rotors]])
+        turns = np.array([[NO_NOTCH if rotor.turns_until_notch is None else rotor.turns_until_notch
+                           for rotor in self.rotors]])
+
+        offsets, positions, turns = step_sequence(positions, turns, codes.size)
+
+        result = self.plugboard[codes]
+        for i in range(len(self.rotors)):
+            result = self.forward[i][offsets[i][0], result]
+        result = self.reflector[result]
+        for i in reversed(range(len(self.rotors))):
+            result = self.backward[i][offsets[i][0], result]
+        result = self.plugboard[result]
+
+        # leave the rotors where the last key press left them
+        for i, rotor in enumerate(self.rotors):
+            rotor.position = int(positions[0, i])
+            rotor.turns_until_notch = None if turns[0, i] == NO_NOTCH else int(turns[0, i])
+
+        return result
@@ -0,0 +1,166 @@
+from registry import intern_wiring
+
+
+class CompiledEngine:
+    """
+    Defines:
+        - a compiled version of an enigma machine's encoding path, in which the
+        rotors, reflector and plugboard are turned into integer lookup tables
+        (letters are represented by their alphabetical index, 0-25)
+        - methods that encode text using only integer arithmetic and table lookups
+
+    The engine works on the rotor objects of the machine it was built from:
+    their positions are read before encoding and written back afterwards, so the
+    machine can switch between the compiled and the object path at any time.
+    """
+
+    def __init__(self, machine):
+        """
+        Constructor. Compiles the machine's current configuration into lookup tables.
+
+        Parameters:
+            machine: the enigma machine to compile (EnigmaMachine)
+        """
+        self.machine = machine
+
+        # the rotors in the order a character goes through them on its way in (right to left)
+        self.rotors = machine.rotors[::-1]
+
+        # whether each rotor is able to rotate at all (the 4th rotor never does)
+        self.can_rotate = [not (len(self.rotors) == 4 and i == 3) for i in range(len(self.rotors))]
+
+        self.forward = [CompiledEngine.tables(rotor.wiring)[0] for rotor in self.rotors]
+        self.backward = [CompiledEngine.tables(rotor.wiring)[1] for rotor in self.rotors]
+        self.reflector = CompiledEngine.tables(machine.reflector.wiring)[0][machine.reflector.position]
+
+        self.compile_plugboard()
+
+
+    def clone(self, machine):
+        """
+        Returns a copy of the engine that works on another machine's rotors, sharing its tables.
+        The other machine must have the same configuration (see EnigmaMachine.clone).
+
+        Parameters:
+            machine: the enigma machine the copy works on (EnigmaMachine)
+        Returns: the copy (CompiledEngine)
+        """
+        engine = CompiledEngine.__new__(CompiledEngine)
+        engine.machine = machine
+        engine.rotors = machine.rotors[::-1]
+        engine.can_rotate = self.can_rotate
+        engine.forward = self.forward
+        engine.backward = self.backward
+        engine.reflector = self.reflector
+        engine.plugboard = self.plugboard
+
+        return engine
+
+
+    def compile_plugboard(self):
+        """
+        (Re)builds the plugboard table from the machine's leads.
+
+        Returns: None
+        """
+        plugboard = []
+        for i in range(26):
+            char = self.machine.run_through_leads(chr(65 + i))
+            if not 65 <= ord(char) <= 90:
+                raise ValueError("The compiled engine only supports leads between letters (A-Z).")
+            plugboard.append(ord(char) - 65)
+
+        self.plugboard = plugboard
+
+
+    def encode(self, text):
+        """
+        Encodes text according to the configuration of the enigma machine.
+        Characters outside A-Z are handed over to the machine's object path.
+
+        Parameters:
+            text: the text to be encoded (str)
+        Returns:
+            the encoded text (str)
+        """
+        text = text.upper()
+        result = []
+
+        positions, turns = self.load_state()
+        rotors = range(len(self.rotors))
+        can_rotate = self.can_rotate
+        forward = self.forward
+        backward = self.backward
+        reflector = self.reflector
+        plugboard = self.plugboard
+
+        for char in text:
+            index = ord(char) - 65
+
+            if not 0 <= index <= 25:
+                # keep the rotor objects in sync while the object path is used
+                self.store_state(positions, turns)
+                result.append(self.machine.encode_single(char, validate=False))
+                positions, turns = self.load_state()
+                continue
+
+            # rotate the rotors, right to left (same conditions as EnigmaMachine.encode_single)
+            for i in rotors:
+                if i == 0 or (can_rotate[i] and turns[i - 1] == 0):
+                    if turns[i] is not None:
+                        turns[i] = turns[i] - 1 if turns[i] > 0 else 25
+                    positions[i] = positions[i] + 1 if positions[i] < 25 else 0
+
+            index = plugboard[index]
+            for i in rotors:
+                index = forward[i][positions[i]][index]
+            index = reflector[index]
+            for i in reversed(rotors):
+                index = backward[i][positions[i]][index]
+            index = plugboard[index]
+
+            result.append(chr(65 + index))
+
+        self.store_state(positions, turns)
+
+        return "".join(result)
+
+
+    def load_state(self):
+        """
+        Reads the positions and turns until notch of the machine's rotors (right to left).
+
+        Returns: the positions and the turns until notch (tuple of two lists)
+        """
+        return [rotor.position for rotor in self.rotors], [rotor.turns_until_notch for rotor in self.rotors]
+
+
+    def store_state(self, positions, turns):
+        """
+        Writes positions and turns until notch back to the machine's rotors (right to left).
+
+        Parameters:
+            positions: the rotor positions (list)
+            turns: the turns until each rotor reaches its notch (list)
+        Returns: None
+        """
+        for rotor, position, turns_until_notch in zip(self.rotors, positions, turns):
+            rotor.position = position
+            rotor.turns_until_notch = turns_until_notch
+
+
+    # STATIC METHODS
+
+    @staticmethod
+    def tables(wiring):
+        """
+        Returns the right to left and left to right tables of a wiring. They are the wiring's
+        shift tables in the registry (see registry.WiringData), built the first time a wiring
+        is seen and shared by every engine and encoder that uses it, so they are immutable
+        (tuples of tuples).
+
+        Parameters:
+            wiring: the wiring of the rotor (sequence of str)
+        Returns: the two tables (tuple)
+        """
+        return intern_wiring(wiring).shift_tables()
@@ -0,0 +1,359 @@
+import heapq
+import itertools
+
+import numpy as np
+
+from batch import TABLES
+from bulk_encoder import start_positions, start_turns, step_sequence
+from scoring import english_monograms, letters_to_codes
+
+
+# the number of letters (trial keys x ciphertext length) decrypted at once
+BLOCK_SIZE = 1 << 22
+
+
+def index_of_coincidence(codes):
+    """
+    Calculates the index of coincidence of texts: the probability that two letters picked
+    at random from a text are the same. English text scores about 0.066, random text 0.038.
+
+    Parameters:
+        codes: the texts as alphabetical indices, one text per row (numpy array, shape (texts, length))
+    Returns: the index of coincidence of each text (numpy array)
+    """
+    codes = np.atleast_2d(codes)
+    texts, length = codes.shape
+    if length < 2:
+        return np.zeros(texts)
+
+    # count the letters of all the texts at once, each text in its own 26 bins
+    bins = codes + 26 * np.arange(texts)[:, None]
+    counts = np.bincount(bins.reshape(-1), minlength=26 * texts).reshape(texts, 26)
+
+    return (counts * (counts - 1)).sum(axis=1) / (length * (length - 1))
+
+
+class DecryptionCore:
+    """
+    Defines:
+        - the lookup tables of one wheel order and reflector, shared by all the
+        trial keys that use them
+        - methods that decrypt a ciphertext under many trial keys at once, without
+        building EnigmaMachine objects
+    """
+
+    def __init__(self, rotors, reflector, tables=TABLES):
+        """
+        Constructor.
+
+        Parameters:
+            rotors: the names of the rotors, left to right (sequence of str)
+            reflector: the name of the reflector (str)
+            tables: the tables the wirings are interned in (WiringTables)
+        """
+        # right to left
+        rotors = [tables.rotor(name) for name in reversed(rotors)]
+        self.notches = [notch for _, notch in rotors]
+
+        reflector_row, _ = tables.rotor(reflector)
+        forward, backward = tables.arrays()
+
+        self.forward = forward[[row for row, _ in rotors]]
+        self.backward = backward[[row for row, _ in rotors]]
+        self.reflector = forward[reflector_row, 0]
+
+        # the rotors other than the rightmost one, together with the reflector, make one fixed
+        # permutation for each combination of their offsets: inner[combination, letter], where
+        # the combination is the offsets (2nd rotor first) read as a base 26 number
+        offsets = np.indices((26,) * (len(rotors) - 1)).reshape(len(rotors) - 1, -1, 1)
+        inner = np.arange(26)
+        for i in range(1, len(rotors)):
+            inner = self.forward[i][offsets[i - 1], inner]
+        inner = self.reflector[inner]
+        for i in reversed(range(1, len(rotors))):
+            inner = self.backward[i][offsets[i - 1], inner]
+        self.inner = inner
+
+
+    def start_state(self, initial_positions, ring_settings):
+        """
+        Computes the starting state of the rotors for a set of trial keys.
+
+        Parameters:
+            initial_positions: initial positions as alphabetical indices, one row per key,
+                               left to right (numpy array, shape (keys, rotors))
+            ring_settings: ring settings starting at 0, same layout (numpy array)
+        Returns: the positions and turns until notch, right to left (tuple of two numpy arrays)
+        """
+        initial_positions = np.asarray(initial_positions)[:, ::-1]
+        ring_settings = np.broadcast_to(ring_settings, initial_positions.shape)[:, ::-1]
+
+        positions = start_positions(initial_positions, ring_settings)
+        turns = np.stack([start_turns(initial_positions[:, i], notch) for i, notch in enumerate(self.notches)],
+                         axis=1)
+
+        return positions, turns
+
+
+    def decrypt(self, codes, initial_positions, ring_settings):
+        """
+        Decrypts a ciphertext (without a plugboard) under many trial keys.
+
+        Parameters:
+            codes: the ciphertext as alphabetical indices (numpy array)
+            initial_positions: initial positions, one row per key, left to right (numpy array)
+            ring_settings: ring settings starting at 0, same layout (numpy array)
+        Returns: the decryptions, one row per key (numpy array, shape (keys, length))
+        """
+        positions, turns = self.start_state(initial_positions, ring_settings)
+        result = np.empty((len(positions), len(codes)), dtype=np.int64)
+
+        keys = max(1, BLOCK_SIZE // max(1, len(codes)))
+        for start in range(0, len(positions), keys):
+            block = slice(start, start + keys)
+            offsets, _, _ = step_sequence(positions[block], turns[block], len(codes))
+
+            combination = offsets[1]
+            for i in range(2, len(offsets)):
+                combination = combination * 26 + offsets[i]
+
+            decrypted = self.forward[0][offsets[0], codes]
+            decrypted = self.inner[combination, decrypted]
+            result[block] = self.backward[0][offsets[0], decrypted]
+
+        return result
+
+
+    def scramblers(self, initial_positions, ring_settings, length):
+        """
+        Computes, for one key, the permutation the rotors and reflector apply to every
+        letter at each position of a message. With these, a trial plugboard only costs
+        three table lookups per letter.
+
+        Parameters:
+            initial_positions: initial positions, left to right (sequence of int)
+            ring_settings: ring settings starting at 0, left to right (sequence of int)
+            length: the length of the message (int)
+        Returns: the permutations (numpy array, shape (length, 26))
+        """
+        positions, turns = self.start_state([initial_positions], [ring_settings])
+        offsets, _, _ = step_sequence(positions, turns, length)
+
+        result = np.arange(26)
+        for i in range(len(self.notches)):
+            result = self.forward[i][offsets[i][0, :, None], result]
+        result = self.reflector[result]
+        for i in reversed(range(len(self.notches))):
+            result = self.backward[i][offsets[i][0, :, None], result]
+
+        return result
+
+
+    def scramblers_at(self, initial_positions, ring_settings, indices):
+        """
+        Computes, for many keys, the permutation the rotors and reflector apply to every
+        letter at some positions of a message.
+
+        Parameters:
+            initial_positions: initial positions, one row per key, left to right (numpy array)
+            ring_settings: ring settings starting at 0, same layout (numpy array)
+            indices: the positions in the message (sequence of int)
+        Returns: the permutations (numpy array, shape (keys, positions, 26))
+        """
+        positions, turns = self.start_state(initial_positions, ring_settings)
+        length = max(indices) + 1
+        offsets, _, _ = step_sequence(positions, turns, length)
+        offsets = [np.broadcast_to(offset, (len(positions), length))[:, indices, None] for offset in offsets]
+
+        combination = offsets[1]
+        for i in range(2, len(offsets)):
+            combination = combination * 26 + offsets[i]
+
+        result = self.forward[0][offsets[0], np.arange(26)]
+        result = self.inner[combination, result]
+        return self.backward[0][offsets[0], result]
+
+
+def decrypt_with_plugboards(codes, scramblers, plugboards):
+    """
+    Decrypts a ciphertext under many trial plugboards, given the scrambler permutations of the key.
+
+    Parameters:
+        codes: the ciphertext as alphabetical indices (numpy array)
+        scramblers: the permutations at each position, see DecryptionCore.scramblers (numpy array)
+        plugboards: the plugboard permutations, one row per trial (numpy array, shape (trials, 26))
+    Returns: the decryptions, one row per trial (numpy array, shape (trials, length))
+    """
+    result = plugboards[:, codes]
+    result = scramblers[np.arange(len(codes)), result]
+    return np.take_along_axis(plugboards, result, axis=1)
+
+
+def parse_key(config):
+    """
+    Turns a configuration (as given to create_enigma_machine) into the rotor names and
+    the initial positions and ring settings as integers, left to right. (tuple)
+    """
+    rotors, reflector, ring_settings, initial_positions = config[:4]
+    initial = [ord(letter) - 65 for letter in initial_positions.split()]
+    rings = [int(ring) - 1 for ring in ring_settings.split()]
+
+    return rotors.split(), reflector, initial, rings
+
+
+def make_key(rotors, reflector, initial_positions, ring_settings, plugboard_pairs=None):
+    """
+    Turns rotor names, initial positions and ring settings (integers) into a configuration
+    that can be given to create_enigma_machine. (tuple)
+    """
+    return (" ".join(rotors), reflector,
+            " ".join("%02d" % (ring + 1) for ring in ring_settings),
+            " ".join(chr(65 + position) for position in initial_positions),
+            list(plugboard_pairs or []))
+
+
+def search_positions(ciphertext, reflector="B", rotors=("I", "II", "III", "IV", "V"), keep=10,
+                     score=index_of_coincidence):
+    """
+    Searches every wheel order (3 rotors out of the given ones) and every start position,
+    with ring settings 01 01 01 and no plugboard, for the keys whose decryptions score best.
+
+    Parameters:
+        ciphertext: the ciphertext (str)
+        reflector: the name of the reflector, default is B (str)
+        rotors: the names of the rotors to choose from (sequence of str)
+        keep: the number of keys to return (int)
+        score: scores decryptions, higher is better, default is the index of coincidence (callable)
+    Returns: the best keys as (score, configuration) pairs, best first (list)
+    """
+    codes = letters_to_codes(ciphertext)
+    initial_positions = np.indices((26, 26, 26)).reshape(3, -1).T
+    ring_settings = np.zeros(3, dtype=np.int64)
+
+    best = []
+    for order in itertools.permutations(rotors, 3):
+        core = DecryptionCore(order, reflector)
+        scores = score(core.decrypt(codes, initial_positions, ring_settings))
+
+        for i in np.argsort(-scores)[:keep]:
+            key = make_key(order, reflector, initial_positions[i], ring_settings)
+            candidate = (float(scores[i]), key)
+            if len(best) < keep:
+                heapq.heappush(best, candidate)
+            elif candidate[0] > best[0][0]:
+                heapq.heapreplace(best, candidate)
+
+    return sorted(best, key=lambda candidate: candidate[0], reverse=True)
+
+
+def search_rings(ciphertext, config, score):
+    """
+    Tries every ring setting of the two rightmost rotors, moving their initial positions so
+    that the rotors' offsets stay the same, and keeps the one whose decryption scores best.
+    (Only the rotors' offsets and when they reach their notch matter, so the ring setting
+    of the leftmost rotor can stay at 01.) The plugboard pairs of the key are kept.
+
+    Parameters:
+        ciphertext: the ciphertext (str)
+        config: the key to start from, as given to create_enigma_machine (tuple)
+        score: scores decryptions, higher is better (callable)
+    Returns: the best key as a (score, configuration) pair (tuple)
+    """
+    rotors, reflector, initial, rings = parse_key(config)
+    pairs = list(config[4]) if len(config) > 4 else []
+
+    plugboard = np.arange(26)
+    for pair in pairs:
+        a, b = ord(pair[0]) - 65, ord(pair[1]) - 65
+        plugboard[a], plugboard[b] = b, a
+    codes = plugboard[letters_to_codes(ciphertext)]
+
+    shifts = np.indices((26, 26)).reshape(2, -1).T
+    initial_positions = np.tile(initial, (len(shifts), 1))
+    ring_settings = np.tile(rings, (len(shifts), 1))
+    for column, shift in zip((-2, -1), shifts.T):
+        initial_positions[:, column] = (initial_positions[:, column] + shift) % 26
+        ring_settings[:, column] = (ring_settings[:, column] + shift) % 26
+
+    core = DecryptionCore(rotors, reflector)
+    scores = score(plugboard[core.decrypt(codes, initial_positions, ring_settings)])
+    best = int(np.argmax(scores))
+
+    return float(scores[best]), make_key(rotors, reflector, initial_positions[best], ring_settings[best], pairs)
+
+
+def search_plugboard(ciphertext, config, score, max_leads=10):
+    """
+    Hill-climbs the plugboard: at every step, every lead that could be added or removed is
+    tried and the change that improves the score the most is kept, until nothing improves it.
+
+    Parameters:
+        ciphertext: the ciphertext (str)
+        config: the key (without plugboard pairs), as given to create_enigma_machine (tuple)
+        score: scores decryptions, higher is better (callable)
+        max_leads: the maximum number of leads, default is 10 (int)
+    Returns: the best key as a (score, configuration) pair (tuple)
+    """
+    codes = letters_to_codes(ciphertext)
+    rotors, reflector, initial, rings = parse_key(config)
+
+    scramblers = DecryptionCore(rotors, reflector).scramblers(initial, rings, len(codes))
+    plugboard = np.arange(26)
+    current = float(score(decrypt_with_plugboards(codes, scramblers, plugboard[None]))[0])
+
+    while True:
+        leads = [(a, int(plugboard[a])) for a in range(26) if a < plugboard[a]]
+        free = [a for a in range(26) if plugboard[a] == a]
+
+        # every lead that can be added, and every lead that can be removed
+        changes = leads[:]
+        if len(leads) < max_leads:
+            changes += list(itertools.combinations(free, 2))
+        if not changes:
+            break
+
+        trials = np.tile(plugboard, (len(changes), 1))
+        for trial, (a, b) in zip(trials, changes):
+            trial[a], trial[b] = trial[b], trial[a]
+
+        scores = score(decrypt_with_plugboards(codes, scramblers, trials))
+        best = int(np.argmax(scores))
+        if scores[best] <= current:
+            break
+
+        current = float(scores[best])
+        plugboard = trials[best]
+
+    pairs = [chr(65 + a) + chr(65 + int(plugboard[a])) for a in range(26) if a < plugboard[a]]
+    return current, make_key(rotors, reflector, initial, rings, pairs)
+
+
+def break_enigma(ciphertext, score=None, reflector="B", rotors=("I", "II", "III", "IV", "V"), candidates=5):
+    """
+    Recovers the key of a ciphertext: the wheel order and start positions are found with the
+    index of coincidence, then the ring settings and the plugboard of the best candidates
+    are hill-climbed with an n-gram scorer (the ring settings once more after the plugboard,
+    since when the rotors turn over is much easier to see in a mostly correct decryption).
+
+    Parameters:
+        ciphertext: the ciphertext (str)
+        score: scores decryptions, higher is better; default is English letter frequencies
+               (a scorer built from a corpus, see scoring.build_tables, works much better) (callable)
+        reflector: the name of the reflector, default is B (str)
+        rotors: the names of the rotors to choose from (sequence of str)
+        candidates: the number of wheel order/start position candidates to refine (int)
+    Returns: the best key as a (score, configuration) pair (tuple)
+    """
+    if score is None:
+        score = english_monograms().score
+
+    best = None
+    for _, config in search_positions(ciphertext, reflector, rotors, keep=candidates):
+        _, config = search_rings(ciphertext, config, score)
+        _, config = search_plugboard(ciphertext, config, score)
+        candidate = search_rings(ciphertext, config, score)
+
+        if best is None or candidate[0] > best[0]:
+            best = candidate
+
+    return best
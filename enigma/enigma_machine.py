@@ -1,41 +1,25 @@
-import itertools
-import string
-import copy
+import time
+
+from compiled_engine import CompiledEngine
+from machine_stats import MachineStats
+from plugboard import Plugboard
+from pluglead import PlugLead
+from registry import REGISTRY
+from rotor import Rotor
 
 # method which returns a Rotor object
 # @param - name - name of the Rotor e.g. I or Gamma
 def rotor_from_name(name):
     """
     Returns a rotor object with the corresponding wiring, given its name.
+    Rotors are looked up in the rotor catalogue (see registry), which can be extended
+    with register_rotor.
 
     Parameters:
         name: the name of the rotor (str)
     Returns: the corresponding rotor (Rotor)
     """
-    # if the name is not a string
-    if not isinstance(name, str):
-        raise TypeError("The name of the rotor must be a string.")
-   
-   # mappings the different rotor names correspond to
-    MAPPING = {
-        "BETA": 0,
-        "GAMMA": 1,
-        "I": 2,
-        "II": 3,
-        "III": 4,
-        "IV": 5,
-        "V": 6,
-        "A": 7,
-        "B": 8,
-        "C": 9    
-    }
-   
-    # if the name does not correspond to a rotor
-    if name.upper() not in MAPPING.keys():
-        raise KeyError("There is no such rotor.")
-
-    rotor_num = MAPPING[name.upper()]
-    return Rotor(rotor_num)
+    return REGISTRY.rotor(name)
 
    
 class EnigmaMachine:
@@ -46,7 +30,13 @@ class EnigmaMachine:
         - methods that allow it to encode text
     """
 
-    def __init__(self, rotors, reflector, ring_settings, initial_positions, plugboard_pairs=[]):
+    # the state of a machine is kept in slots rather than in an instance dictionary
+    __slots__ = ("plugboard", "rotors", "reflector", "engine", "bulk_encoder", "scrambler_cache", "wiring_key",
+                 "rotor_names", "reflector_name", "ring_settings", "initial_positions", "plugboard_pairs",
+                 "initial_state", "statistics")
+
+    def __init__(self, rotors, reflector, ring_settings, initial_positions, plugboard_pairs=[], compiled=False,
+                 scrambler_cache=None):
         """
         Constructor. Creates an enigma machine with the given characteristics.
 
@@ -56,6 +46,9 @@ class EnigmaMachine:
             ring_settings: ring settings for the rotors (str)
             initial_positions: starting positions of the rotors (str)
             plugboard_pairs: plugboard pairs to be used, default is an empty list (list)
+            compiled: whether to encode using precomputed integer tables, default is False (bool)
+            scrambler_cache: a cache of scrambler permutations to look letters up in,
+                             default is None (ScramblerCache)
 
         Parameter description credit goes to the author of the original enigma.ipynb.
         """
@@ -65,6 +58,19 @@ class EnigmaMachine:
        
         self.plugboard = Plugboard()
         self.rotors = []
+        self.engine = None
+        self.bulk_encoder = None
+        self.scrambler_cache = None
+        self.wiring_key = None
+        # statistics are only recorded once enabled (see enable_stats)
+        self.statistics = None
+
+        # the configuration the machine was built from (see config)
+        self.rotor_names = rotors
+        self.reflector_name = reflector
+        self.ring_settings = ring_settings
+        self.initial_positions = initial_positions
+        self.plugboard_pairs = []
 
         if isinstance(reflector, str):
             self.reflector = rotor_from_name(reflector)
@@ -95,6 +101,15 @@ class EnigmaMachine:
         # add leads to the plugboard
         self.add_leads(plugboard_pairs)
 
+        # the state of the rotors before any character is encoded
+        self.initial_state = self.rotor_state()
+
+        if compiled:
+            self.engine = CompiledEngine(self)
+
+        if scrambler_cache is not None:
+            self.set_scrambler_cache(scrambler_cache)
+
 
     def encode(self, text):
         """
@@ -105,32 +120,356 @@ class EnigmaMachine:
         Returns:
             the encoded text (str)
         """
+        # the text is checked once here; the characters it is made of need no further checks
+        if not isinstance(text, str):
+            raise TypeError("Text to be encoded must be a string.")
+
+        if self.engine is not None:
+            if self.statistics is not None:
+                return self.encode_compiled_measured(text)
+            return self.engine.encode(text)
+
         # in case non capital letters are given
         text = text.upper()
-        result = ""
+        result = []
    
         for char in text:
-            result += self.encode_single(char)
+            result.append(self.encode_single(char, validate=False))
 
-        return result
+        return "".join(result)
+
+
+    def encode_iter(self, chunks):
+        """
+        Encodes text that arrives in chunks, carrying the rotor state from one chunk to the next.
+
+        Parameters:
+            chunks: the chunks of text to be encoded (iterable of str or bytes)
+        Returns:
+            a generator of encoded chunks, each of the same type as the chunk it came from
+        """
+        for chunk in chunks:
+            if isinstance(chunk, (bytes, bytearray)):
+                yield self.encode(chunk.decode("ascii")).encode("ascii")
+            elif isinstance(chunk, str):
+                yield self.encode(chunk)
+            else:
+                raise TypeError("Chunks to be encoded must be strings or bytes.")
+
+
+    def encode_stream(self, reader, writer, chunk_size=65536):
+        """
+        Encodes everything that can be read from a file-like object and writes the result
+        to another one as it goes, so only one chunk is held in memory at a time.
+
+        Parameters:
+            reader: the object to read from, in text or binary mode (file-like)
+            writer: the object to write to, in the same mode as the reader (file-like)
+            chunk_size: the number of characters (or bytes) read at a time, default is 65536 (int)
+        Returns:
+            the number of characters (or bytes) encoded (int)
+        """
+        if not isinstance(chunk_size, int):
+            raise TypeError("Chunk size must be an integer.")
+        if chunk_size < 1:
+            raise ValueError("Chunk size must be positive.")
+
+        def read_chunks():
+            chunk = reader.read(chunk_size)
+            while chunk:
+                yield chunk
+                chunk = reader.read(chunk_size)
+
+        total = 0
+        for encoded in self.encode_iter(read_chunks()):
+            writer.write(encoded)
+            total += len(encoded)
+
+        return total
      
 
-    def encode_single(self, char):
+    def encode_array(self, codes):
+        """
+        Encodes a whole message at once using NumPy array operations (requires NumPy).
+        The rotors are left in the same state the scalar encode would leave them in.
+
+        Parameters:
+            codes: the alphabetical indices of the letters to be encoded, 0-25 (numpy array)
+        Returns:
+            the alphabetical indices of the encoded letters (numpy array)
+        """
+        if self.bulk_encoder is None:
+            from bulk_encoder import BulkEncoder
+            self.bulk_encoder = BulkEncoder(self)
+
+        return self.bulk_encoder.encode(codes)
+
+
+    def encode_bytes(self, data):
+        """
+        Encodes a message of ASCII letters using NumPy array operations (requires NumPy).
+
+        Parameters:
+            data: the letters to be encoded, lowercase letters are encoded as capitals (bytes)
+        Returns:
+            the encoded letters (bytes)
+        """
+        import numpy as np
+
+        if not isinstance(data, (bytes, bytearray, memoryview)):
+            raise TypeError("Data to be encoded must be bytes.")
+
+        codes = np.frombuffer(data, dtype=np.uint8)
+        # in case non capital letters are given
+        codes = np.where((codes >= 97) & (codes <= 122), codes - 32, codes)
+        if codes.size and (codes.min() < 65 or codes.max() > 90):
+            raise ValueError("Data to be encoded must only contain letters.")
+
+        result = self.encode_array(codes.astype(np.int64) - 65)
+
+        return (result + 65).astype(np.uint8).tobytes()
+
+
+    def encode_into(self, src, dst, non_letters="pass"):
+        """
+        Encodes a buffer of ASCII bytes and writes the result into another buffer, using
+        NumPy array operations on views of the buffers (requires NumPy). Lowercase letters
+        are encoded as capitals; only letters move the rotors.
+
+        Parameters:
+            src: the bytes to be encoded (bytes-like object)
+            dst: the buffer the result is written to, which may be src itself
+                 (writable bytes-like object, e.g. bytearray or memoryview)
+            non_letters: what to do with bytes that are not letters: "pass" copies them to
+                         the output unchanged, "drop" leaves them out and "error" raises
+                         a ValueError, default is "pass" (str)
+        Returns:
+            the number of bytes written to dst (int)
+        """
+        import numpy as np
+        from bulk_encoder import BLOCK_SIZE
+
+        if non_letters not in ("pass", "drop", "error"):
+            raise ValueError("Non-letters must be passed, dropped or treated as an error.")
+
+        try:
+            source = np.frombuffer(src, dtype=np.uint8)
+            target = np.frombuffer(dst, dtype=np.uint8)
+        except TypeError:
+            raise TypeError("Source and destination must be bytes-like objects.")
+        if not target.flags.writeable:
+            raise TypeError("The destination buffer must be writable.")
+
+        def is_letter(block):
+            # clearing the case bit turns lowercase letters into capitals (and nothing else into a letter)
+            folded = block & 0xDF
+            return (folded >= 65) & (folded <= 90)
+
+        if non_letters == "error":
+            for start in range(0, source.size, BLOCK_SIZE):
+                if not is_letter(source[start:start + BLOCK_SIZE]).all():
+                    raise ValueError("Data to be encoded must only contain letters.")
+
+        if non_letters == "drop":
+            needed = sum(int(is_letter(source[start:start + BLOCK_SIZE]).sum())
+                         for start in range(0, source.size, BLOCK_SIZE))
+        else:
+            needed = source.size
+        if target.size < needed:
+            raise ValueError("The destination buffer is too small.")
+
+        written = 0
+        for start in range(0, source.size, BLOCK_SIZE):
+            block = source[start:start + BLOCK_SIZE]
+            letters = is_letter(block)
+            encoded = (self.encode_array((block[letters] & 0xDF) - 65) + 65).astype(np.uint8)
+
+            if non_letters == "drop":
+                target[written:written + encoded.size] = encoded
+                written += encoded.size
+            else:
+                output = target[start:start + block.size]
+                if non_letters == "pass":
+                    output[~letters] = block[~letters]
+                output[letters] = encoded
+                written += block.size
+
+        return written
+
+
+    def encode_single(self, char, validate=True):
         """
         Encodes a single character according to the configuration of the enigma machine.
 
         Parameters:
             char: the character to be encoded (str)
+            validate: whether to check the character, default is True; only pass False
+                      if the caller has already checked it (bool)
         Returns: the encoded character (str)
         """
-        result = self.run_through_leads(char)
-        position = -1
-        reversed_rotors = self.rotors[::-1]
+        if self.statistics is not None:
+            return self.encode_single_measured(char, validate)
+
+        result = self.run_through_leads(char, validate)
+
+        # the rotors step before the character goes through them
+        self.step_rotors()
+
+        if self.scrambler_cache is not None and "A" <= result <= "Z":
+            # the rotors and reflector in their current positions, as one permutation
+            key = (self.wiring_key, tuple(rotor.position % 26 for rotor in self.rotors))
+            permutation = self.scrambler_cache.permutation(key, self.scrambler_permutation)
+            result = permutation[ord(result) - 65]
+        else:
+            result = self.scramble(result, validate)
+
+        result = self.run_through_leads(result, validate)
        
-        # send character through the rotors from right to left
-        for rotor in reversed(self.rotors):
-           
-            position += 1
+        return result
+
+
+    def encode_single_measured(self, char, validate=True):
+        """
+        Encodes a single character like encode_single, recording the number of passes
+        through each stage and the time they take (see enable_stats).
+
+        Parameters:
+            char: the character to be encoded (str)
+            validate: whether to check the character, default is True (bool)
+        Returns: the encoded character (str)
+        """
+        statistics = self.statistics
+        clock = time.perf_counter
+        statistics.characters += 1
+
+        start = clock()
+        result = self.run_through_leads(char, validate)
+        statistics.record("plugboard", clock() - start)
+
+        positions = [rotor.position for rotor in self.rotors]
+        start = clock()
+        self.step_rotors()
+        seconds = clock() - start
+        # a rotation always changes a rotor's position
+        statistics.record_step(seconds, [position != rotor.position
+                                         for position, rotor in zip(positions[::-1], self.rotors[::-1])])
+
+        if self.scrambler_cache is not None and "A" <= result <= "Z":
+            start = clock()
+            key = (self.wiring_key, tuple(rotor.position % 26 for rotor in self.rotors))
+            permutation = self.scrambler_cache.permutation(key, self.scrambler_permutation)
+            result = permutation[ord(result) - 65]
+            statistics.record("scrambler_cache", clock() - start)
+        else:
+            start = clock()
+            for rotor in reversed(self.rotors):
+                result = rotor.encode_right_to_left(result, False, validate)
+            statistics.record("rotors_forward", clock() - start)
+
+            start = clock()
+            result = self.reflector.encode_right_to_left(result, False, validate)
+            statistics.record("reflector", clock() - start)
+
+            start = clock()
+            for rotor in self.rotors:
+                result = rotor.encode_left_to_right(result, validate)
+            statistics.record("rotors_backward", clock() - start)
+
+        start = clock()
+        result = self.run_through_leads(result, validate)
+        statistics.record("plugboard", clock() - start)
+
+        return result
+
+
+    def encode_compiled_measured(self, text):
+        """
+        Encodes text with the compiled engine, recording the number of characters and the
+        time taken. The compiled engine does not go through the stages one at a time, so only
+        characters it hands over to the object path are broken down into stages. Its key
+        presses are not timed, but their rotations, turnovers and double steps are counted
+        from the state of the rotors before the text (see count_rotations).
+
+        Parameters:
+            text: the text to be encoded (str)
+        Returns: the encoded text (str)
+        """
+        statistics = self.statistics
+        # the engine encodes the text in capital letters, which may be longer (e.g. ß --> SS)
+        text = text.upper()
+
+        # characters handed over to the object path count themselves (and their key presses)
+        handed_over = statistics.characters
+        rotations_before = statistics.rotations[:]
+        double_steps_before = statistics.double_steps
+        rotations, double_steps = self.count_rotations(self.rotor_state(), len(text))
+
+        start = time.perf_counter()
+        result = self.engine.encode(text)
+        seconds = time.perf_counter() - start
+
+        handed_over = statistics.characters - handed_over
+        statistics.record("compiled", seconds, len(text) - handed_over)
+        statistics.characters += len(text) - handed_over
+
+        # every character is a key press, wherever it is encoded
+        rotations = [total - (after - before)
+                     for total, before, after in zip(rotations, rotations_before, statistics.rotations)]
+        double_steps -= statistics.double_steps - double_steps_before
+        statistics.record_steps(len(text) - handed_over, rotations, double_steps)
+
+        return result
+
+
+    def enable_stats(self, enabled=True):
+        """
+        Starts (or stops) recording statistics about the characters the machine encodes.
+        While statistics are disabled, encoding costs one extra check per character.
+
+        Parameters:
+            enabled: whether to record statistics, default is True (bool)
+        Returns: None
+        """
+        if enabled:
+            if self.statistics is None:
+                self.statistics = MachineStats()
+        else:
+            self.statistics = None
+
+
+    def stats(self):
+        """
+        Returns a snapshot of the statistics recorded since they were enabled: the number of
+        characters encoded, the number of passes through (and the time spent in) the plugboard,
+        the rotors on the way in and out, the reflector and the scrambler cache, and the key
+        presses, with the rotations of each rotor (right to left), the turnovers of the 2nd and
+        3rd rotors and the double steps (key presses that rotate both). (dict)
+        """
+        if self.statistics is None:
+            raise ValueError("Statistics are not enabled (see enable_stats).")
+
+        return self.statistics.snapshot()
+
+
+    def reset_stats(self):
+        """
+        Sets the recorded statistics back to 0, if they are enabled.
+
+        Returns: None
+        """
+        if self.statistics is not None:
+            self.statistics.reset()
+
+
+    def step_rotors(self):
+        """
+        Rotates the rotors as a key press does, before the character goes through them.
+
+        Returns: None
+        """
+        reversed_rotors = self.rotors[::-1]
+
+        for position, rotor in enumerate(reversed_rotors):
 
             # CONDITIONS FOR ROTATING
             # c1: the rotor is the 1st rotor, which always rotates
@@ -138,51 +477,312 @@ class EnigmaMachine:
             # c3: the rotor is either the 2nd or the 3rd rotor, which rotates only
             # if the previous rotor has a notch and has reached the notch
 
-            c1 = rotor == self.rotors[-1]
+            c1 = position == 0
+            c2 = position < 3
 
-            if len(self.rotors) == 4:
-                # the rotor is not the 4th rotor
-                c2 = rotor != self.rotors[0]
-            else:
-                # there is no 4th rotor
-                c2 = True
+            # 2nd/3rd rotor (the previous rotor has already stepped during this key press)
+            c3 = (not c1) and c2 and reversed_rotors[position - 1].has_reached_notch()
+
+            if c1 or c3:
+                rotor.rotate()
+
+
+    def scramble(self, char, validate=True):
+        """
+        Sends a character through the rotors (right to left), the reflector and the
+        rotors again (left to right), without rotating anything.
+
+        Parameters:
+            char: the character to be scrambled (str)
+            validate: whether to check the character, default is True; only pass False
+                      if the caller has already checked it (bool)
+        Returns: the scrambled character (str)
+        """
+        result = char
 
-            # 2nd/3rd rotor
-            c3 = (not c1) and (c2) and (reversed_rotors[position - 1].has_reached_notch())
+        # send character through the rotors from right to left
+        for rotor in reversed(self.rotors):
+            result = rotor.encode_right_to_left(result, False, validate)
 
-            rotate = c1 or c3
-           
-            result = rotor.encode_right_to_left(result, rotate=rotate)
-           
         # send resulting character through the reflector
-        result = self.reflector.encode_right_to_left(result, rotate=False)
+        result = self.reflector.encode_right_to_left(result, False, validate)
 
         # send resulting character through the rotors from left to right
         for rotor in self.rotors:
-            result = rotor.encode_left_to_right(result)
+            result = rotor.encode_left_to_right(result, validate)
 
-        result = self.run_through_leads(result)
-       
         return result
 
-    def run_through_leads(self, char):
+
+    def scrambler_permutation(self):
+        """
+        Returns the permutation the rotors and reflector apply to the letters A-Z in
+        their current positions (str of length 26).
+        """
+        return "".join(self.scramble(chr(65 + i), validate=False) for i in range(26))
+
+
+    def set_scrambler_cache(self, cache):
+        """
+        Makes the machine look letters up in a cache of scrambler permutations.
+        This has to be called again if the wiring of the rotors or the reflector is changed.
+
+        Parameters:
+            cache: the cache to use, or None to stop using one (ScramblerCache)
+        Returns: None
+        """
+        self.scrambler_cache = cache
+
+        # identifies the rotors and reflector in the cache's keys
+        wirings = ["".join(rotor.wiring) for rotor in self.rotors]
+        self.wiring_key = (tuple(wirings), "".join(self.reflector.wiring), self.reflector.position)
+
+
+    def recompile(self):
+        """
+        Rebuilds the machine's compiled tables, bulk encoder tables and scrambler cache key
+        from the current wirings of its rotors and reflector. This has to be called if the
+        wiring of the reflector is changed (see swap_cross and swap_loop) after the machine was
+        compiled or encoded with encode_array, encode_bytes or encode_into; until then those
+        paths keep encoding with the old wiring.
+
+        Returns: None
+        """
+        if self.engine is not None:
+            self.engine = CompiledEngine(self)
+
+        # built again the next time it is needed
+        self.bulk_encoder = None
+
+        if self.scrambler_cache is not None:
+            self.set_scrambler_cache(self.scrambler_cache)
+
+
+    def parallel_encode(self, text, workers=None):
+        """
+        Encodes text by splitting it into chunks that are encoded by a pool of processes.
+        The result (and the state the rotors are left in) is the same as that of encode.
+
+        Parameters:
+            text: the text to be encoded (str)
+            workers: the number of processes, default is the number of CPUs (int)
+        Returns:
+            the encoded text (str)
+        """
+        from parallel import parallel_encode
+        return parallel_encode(self, text, workers)
+
+
+    def config(self):
+        """
+        Returns the configuration the machine was built from, in the order of the
+        constructor's arguments: rotors, reflector, ring settings, initial positions
+        and plugboard pairs. (tuple)
+        """
+        return (self.rotor_names, self.reflector_name, self.ring_settings,
+                self.initial_positions, list(self.plugboard_pairs))
+
+
+    def rotor_state(self):
+        """
+        Returns the current state of the rotors: a (position, turns until notch)
+        pair for each rotor, left to right. (tuple)
+        """
+        return tuple((rotor.position, rotor.turns_until_notch) for rotor in self.rotors)
+
+
+    def set_rotor_state(self, state):
+        """
+        Puts the rotors in a given state.
+
+        Parameters:
+            state: a (position, turns until notch) pair for each rotor, left to right (tuple)
+        Returns: None
+        """
+        if len(state) != len(self.rotors):
+            raise ValueError("The state must contain one pair for each rotor.")
+
+        for rotor, (position, turns_until_notch) in zip(self.rotors, state):
+            rotor.position = position
+            rotor.turns_until_notch = turns_until_notch
+
+
+    def snapshot(self):
+        """
+        Returns the current state of the rotors, to be restored later (see restore). (tuple)
+        """
+        return self.rotor_state()
+
+
+    def restore(self, snapshot):
+        """
+        Puts the rotors back in a state returned by snapshot.
+
+        Parameters:
+            snapshot: the state to restore (tuple)
+        Returns: None
+        """
+        self.set_rotor_state(snapshot)
+
+
+    def reset(self):
+        """
+        Puts the rotors back in the state they were in before any character was encoded,
+        without rebuilding the machine.
+
+        Returns: None
+        """
+        self.set_rotor_state(self.initial_state)
+
+
+    def clone(self):
+        """
+        Returns a copy of the machine in its current state. The copy shares the wirings and
+        compiled tables of the machine, but its rotors and plugboard are its own. (EnigmaMachine)
+        """
+        machine = EnigmaMachine.__new__(EnigmaMachine)
+
+        machine.rotors = [rotor.clone() for rotor in self.rotors]
+        machine.reflector = self.reflector.clone()
+        machine.plugboard = self.plugboard.clone()
+
+        machine.rotor_names = self.rotor_names
+        machine.reflector_name = self.reflector_name
+        machine.ring_settings = self.ring_settings
+        machine.initial_positions = self.initial_positions
+        machine.plugboard_pairs = list(self.plugboard_pairs)
+        machine.initial_state = self.initial_state
+
+        machine.scrambler_cache = self.scrambler_cache
+        machine.wiring_key = self.wiring_key
+
+        # the copy starts without statistics
+        machine.statistics = None
+        machine.engine = None if self.engine is None else self.engine.clone(machine)
+        machine.bulk_encoder = None if self.bulk_encoder is None else self.bulk_encoder.clone(machine)
+
+        return machine
+
+
+    def state_at(self, n):
+        """
+        Calculates the state of the rotors after the first n characters of a message
+        have been encoded, without encoding them.
+
+        Parameters:
+            n: the offset into the message (int)
+        Returns: the state of the rotors, as returned by rotor_state (tuple)
+        """
+        return self.advance_state(self.initial_state, n)
+
+
+    def seek(self, n):
+        """
+        Puts the rotors in the state they are in after the first n characters of a message
+        have been encoded, so that encoding can start at any offset of the message.
+
+        Parameters:
+            n: the offset into the message (int)
+        Returns: None
+        """
+        self.set_rotor_state(self.state_at(n))
+
+
+    def advance_state(self, state, n):
+        """
+        Calculates the state of the rotors n key presses after a given state, in constant time.
+
+        The rightmost rotor rotates on every key press. The 2nd rotor rotates on the key presses
+        that leave the rightmost rotor at its notch, which happens every 26 key presses once the
+        notch is first reached. The 3rd rotor rotates on every key press during which the 2nd rotor
+        is at its notch, i.e. for 26 key presses in a row every 26 rotations of the 2nd rotor.
+        The 4th rotor (if there is one) never rotates. Rotors without a notch never make
+        their neighbour rotate.
+
+        Parameters:
+            state: a (position, turns until notch) pair for each rotor, left to right (tuple)
+            n: the number of key presses (int)
+        Returns: the state of the rotors after the key presses (tuple)
+        """
+        if not isinstance(n, int):
+            raise TypeError("The number of key presses must be an integer.")
+        if n < 0:
+            raise ValueError("The number of key presses cannot be negative.")
+
+        # right to left
+        positions = [position for position, _ in reversed(state)]
+        turns = [turns_until_notch for _, turns_until_notch in reversed(state)]
+        rotations, _ = self.count_rotations(state, n)
+
+        new_state = [(Rotor.position_after(position, rotated), Rotor.turns_after(turns_until_notch, rotated))
+                     for position, turns_until_notch, rotated in zip(positions, turns, rotations)]
+
+        return tuple(reversed(new_state))
+
+
+    def count_rotations(self, state, n):
+        """
+        Counts the rotations of each rotor over n key presses from a given state, in constant
+        time (see advance_state for the rules), and the double steps among them: the key presses
+        on which the 2nd rotor reaches its notch, so that the 3rd rotor rotates with it.
+
+        Parameters:
+            state: a (position, turns until notch) pair for each rotor, left to right (tuple)
+            n: the number of key presses (int)
+        Returns: the rotations of each rotor, right to left (list of int), and the number of
+                 double steps (int)
+        """
+        # right to left
+        turns = [turns_until_notch for _, turns_until_notch in reversed(state)]
+        rotations = [0] * len(turns)
+        double_steps = 0
+
+        # 1st rotor
+        rotations[0] = n
+
+        # 2nd rotor: once when the 1st rotor reaches its notch, then every 26 key presses
+        first_turnover = None
+        if turns[0] is not None:
+            first_turnover = Rotor.rotations_until_notch(turns[0])
+            if n >= first_turnover:
+                rotations[1] = (n - first_turnover) // 26 + 1
+
+        # 3rd rotor: every key press during which the 2nd rotor is at its notch
+        if turns[1] is not None:
+            if turns[1] == 0:
+                # the 2nd rotor is at its notch until it first rotates
+                rotations[2] += n if first_turnover is None else min(n, first_turnover - 1)
+
+            if first_turnover is not None:
+                # the key press on which the 2nd rotor first reaches its notch (a double step);
+                # it then stays there for 26 key presses, once every 26 * 26 key presses
+                start = first_turnover + 26 * (Rotor.rotations_until_notch(turns[1]) - 1)
+                if n >= start:
+                    revolutions = (n - start) // 676
+                    rotations[2] += 26 * revolutions + min(26, n - start - 676 * revolutions + 1)
+                    double_steps = revolutions + 1
+
+        return rotations, double_steps
+
+
+    def run_through_leads(self, char, validate=True):
         """
         Modifies the value of the character according to the machine's plugboard configuration.
         If the no pluglead is connected to the character, it remains the same.
 
         Parameters:
             char: the character to be modified (str)
+            validate: whether to check the character, default is True; only pass False
+                      if the caller has already checked it (bool)
         Returns: the modified (or not) character (str)
         """
-        if not isinstance(char, str):
-            raise TypeError("Character to pass through leads must be a string.")
-        if len(char) != 1:
-            raise ValueError("Character to pass through leads must be a single character.")
+        if validate:
+            if not isinstance(char, str):
+                raise TypeError("Character to pass through leads must be a string.")
+            if len(char) != 1:
+                raise ValueError("Character to pass through leads must be a single character.")
 
-        result = char
-        for lead in self.plugboard.leads:
-            result = lead.encode(result)
-        return result
+        return self.plugboard.mapping.get(char, char)
 
 
     def add_leads(self, plugboard_pairs):
@@ -202,6 +802,39 @@ class EnigmaMachine:
             pair = pair.upper()
             lead = PlugLead(pair)
             self.plugboard.add(lead)
+            self.plugboard_pairs.append(pair)
+
+        # keep the compiled plugboard tables up to date
+        for engine in (self.engine, self.bulk_encoder):
+            if engine is not None:
+                engine.compile_plugboard()
+
+
+    def remove_leads(self, plugboard_pairs):
+        """
+        Remove the leads connecting character pairs from the enigma machine's plugboard.
+
+        Parameters:
+            plugboard_pairs: the character pairs whose leads will be removed (list)
+        Returns: None
+        """
+        for pair in plugboard_pairs:
+            if not isinstance(pair, str):
+                raise TypeError("Plugboard pairs must be strings.")
+
+            pair = pair.upper()
+            if pair not in self.plugboard_pairs:
+                raise ValueError("There is no lead connecting this pair.")
+
+            # the pairs are kept in the same order as the plugboard's leads
+            index = self.plugboard_pairs.index(pair)
+            self.plugboard.remove(self.plugboard.leads[index])
+            del self.plugboard_pairs[index]
+
+        # keep the compiled plugboard tables up to date
+        for engine in (self.engine, self.bulk_encoder):
+            if engine is not None:
+                engine.compile_plugboard()
 
 
     def initialize_rotors(self, rotors_list, ring_settings_list, initial_positions_list):
@@ -237,33 +870,40 @@ def swap_cross(reflector, pair):
         pair: the first two characters of each pair to be modified
               (for the example above, ('A', 'B')) (tuple)
     Returns: the reflector with its wires crossed (Rotor)
+
+    A machine that uses the reflector must be recompiled afterwards (see EnigmaMachine.recompile).
     """
     if not(isinstance(reflector, Rotor)):
         raise TypeError("Reflector must be a rotor.")
     if not(isinstance(pair, tuple)):
         raise TypeError("Pair must be a tuple.")
    
+    # wirings are shared between rotors, so the new wiring is built separately
+    wiring = list(reflector.wiring)
+
     # alphabetical index
     first_index = ord(pair[0]) % 65
     second_index = ord(pair[1]) % 65
 
     # index contents
-    first_content = reflector.wiring[first_index]
-    second_content = reflector.wiring[second_index]
+    first_content = wiring[first_index]
+    second_content = wiring[second_index]
 
     # replace the content of the first index with that of the second index
     # and vice versa
     # A --> B, C --> D: A --> D, B --> C
-    reflector.wiring[first_index] = second_content
-    reflector.wiring[second_index] = first_content
+    wiring[first_index] = second_content
+    wiring[second_index] = first_content
 
     # B --> A, D --> C: B --> C, D --> A
     first_other_index = ord(first_content) % 65
     second_other_index = ord(second_content) % 65
 
-    reflector.wiring[first_other_index] = pair[1]
-    reflector.wiring[second_other_index] = pair[0]
-   
+    wiring[first_other_index] = pair[1]
+    wiring[second_other_index] = pair[0]
+
+    reflector.wiring = tuple(wiring)
+
     return reflector
 
 
@@ -277,32 +917,40 @@ def swap_loop(reflector, pair):
         pair: the first two characters of each pair to be modified
               (for the example above, ('A', 'B')) (tuple)
     Returns: the reflector with its wiring changed (Rotor)
+
+    A machine that uses the reflector must be recompiled afterwards (see EnigmaMachine.recompile).
     """
     if not(isinstance(reflector, Rotor)):
         raise TypeError("Reflector must be a rotor.")
     if not(isinstance(pair, tuple)):
         raise TypeError("Pair must be a tuple.")
 
+    # wirings are shared between rotors, so the new wiring is built separately
+    wiring = list(reflector.wiring)
+
     # alphabetical index
     first_index = ord(pair[0]) % 65
     second_index = ord(pair[1]) % 65
 
     # index contents
-    first_content = reflector.wiring[first_index]
-    second_content = reflector.wiring[second_index]
+    first_content = wiring[first_index]
+    second_content = wiring[second_index]
 
     # A --> B, C --> D: A --> C, B --> D
-    reflector.wiring[first_index] = pair[1]
-    reflector.wiring[second_index] = pair[0]
+    wiring[first_index] = pair[1]
+    wiring[second_index] = pair[0]
 
     # B --> A, D --> C: B --> D, A --> C
-    reflector.wiring[ord(first_content) % 65] = second_content
-    reflector.wiring[ord(second_content) % 65] = first_content
+    wiring[ord(first_content) % 65] = second_content
+    wiring[ord(second_content) % 65] = first_content
+
+    reflector.wiring = tuple(wiring)
 
     return reflector
 
 
-def create_enigma_machine(rotors, reflector, ring_settings, initial_positions, plugboard_pairs):
+def create_enigma_machine(rotors, reflector, ring_settings, initial_positions, plugboard_pairs, compiled=False,
+                          scrambler_cache=None):
     """
     Method that returns a configured enigma machine object. (EnigmaMachine)
 
@@ -312,9 +960,13 @@ def create_enigma_machine(rotors, reflector, ring_settings, initial_positions, p
         ring_settings: ring settings for the rotors (str)
         initial_positions: starting positions of the rotors (str)
         plugboard_pairs: plugboard pairs to be used, default is an empty list (list)
+        compiled: whether to encode using precomputed integer tables, default is False (bool)
+        scrambler_cache: a cache of scrambler permutations to look letters up in,
+                         default is None (ScramblerCache)
 
     Parameter description credit goes to the author of the original enigma.ipynb.
     """
-    enigma = EnigmaMachine(rotors, reflector, ring_settings, initial_positions, plugboard_pairs)
+    enigma = EnigmaMachine(rotors, reflector, ring_settings, initial_positions, plugboard_pairs, compiled,
+                           scrambler_cache)
  
     return enigma
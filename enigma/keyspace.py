@@ -0,0 +1,308 @@
+import itertools
+import json
+import os
+
+from enigma_machine import EnigmaMachine, swap_cross, swap_loop
+from registry import REGISTRY
+
+
+# the ways the wiring of a reflector can be changed (see swap_cross and swap_loop)
+REWIRINGS = ("cross", "loop")
+
+
+class Keyspace:
+    """
+    Defines:
+        - the keyspace of a key search: every wheel order, reflector (optionally rewired with
+        swap_cross or swap_loop), set of ring settings and set of start positions
+        - keys as single integers (mixed radix numbers whose digits are, from most to least
+        significant: wheel order, reflector, rewiring, ring settings and start positions,
+        left to right), so that ranges of keys can be handed out, stored and resumed
+        - methods that decode keys and iterate over (shards of) the keyspace
+    """
+
+    def __init__(self, rotors=("I", "II", "III", "IV", "V"), reflectors=("B",), slots=3,
+                 ring_rotors=None, rewirings=False):
+        """
+        Constructor. Describes a keyspace.
+
+        Parameters:
+            rotors: the names of the rotors the wheel orders are chosen from (sequence of str)
+            reflectors: the names of the reflectors, which must be registered as reflectors (sequence of str)
+            slots: the number of rotors in a machine, 3 or 4, default is 3 (int)
+            ring_rotors: the number of rotors, counted from the right, whose ring settings are
+                         searched; the others stay at 01. Default is None (all of them) (int)
+            rewirings: whether to include every rewiring of the reflectors by swap_cross and
+                       swap_loop (2 x 78 per reflector), default is False (bool)
+        """
+        if slots not in (3, 4):
+            raise ValueError("A machine must have 3 or 4 rotors.")
+        if ring_rotors is None:
+            ring_rotors = slots
+        if not (isinstance(ring_rotors, int) and 0 <= ring_rotors <= slots):
+            raise ValueError("The number of rotors whose ring settings are searched must be between 0 and the number of rotors.")
+
+        # check the names now rather than when the first key is decoded
+        for name in rotors:
+            REGISTRY.get(name)
+        # every reflector in the catalogue connects the letters in 13 pairs (78 pairs of wires to rewire)
+        for name in reflectors:
+            if not REGISTRY.get(name).reflector:
+                raise ValueError(f"{name} is not a reflector.")
+
+        self.rotors = tuple(rotors)
+        self.reflectors = tuple(reflectors)
+        self.slots = slots
+        self.ring_rotors = ring_rotors
+        self.rewirings = bool(rewirings)
+
+        self.orders = list(itertools.permutations(self.rotors, slots))
+        if not self.orders:
+            raise ValueError("There are not enough rotors to fill the machine.")
+
+        # 0 is no rewiring; then every pair of wires of the reflector, crossed, then looped
+        self.rewiring_count = 1 + len(REWIRINGS) * 78 if self.rewirings else 1
+
+        # the radix of each digit, most significant first
+        self.radices = ([len(self.orders), len(self.reflectors), self.rewiring_count]
+                        + [26] * (ring_rotors + slots))
+
+        # the number of keys that share the same wheel order, reflector and rewiring
+        self.block_size = 26 ** (ring_rotors + slots)
+        self.size = len(self.orders) * len(self.reflectors) * self.rewiring_count * self.block_size
+
+
+    def __len__(self):
+        """
+        Returns the number of keys in the keyspace. (int)
+        """
+        return self.size
+
+
+    def digits(self, key):
+        """
+        Splits a key into its digits.
+
+        Parameters:
+            key: the key (int)
+        Returns: the wheel order, reflector and rewiring indices, the ring settings and the
+                 start positions (left to right, as alphabetical indices) (tuple)
+        """
+        if not (isinstance(key, int) and 0 <= key < self.size):
+            raise ValueError("The key is not in the keyspace.")
+
+        digits = []
+        for radix in reversed(self.radices):
+            key, digit = divmod(key, radix)
+            digits.append(digit)
+        digits.reverse()
+
+        rings = tuple(digits[3:3 + self.ring_rotors])
+        positions = tuple(digits[3 + self.ring_rotors:])
+
+        # rotors whose ring settings are not searched stay at 01
+        rings = (0,) * (self.slots - self.ring_rotors) + rings
+
+        return digits[0], digits[1], digits[2], rings, positions
+
+
+    def rewiring(self, reflector, index):
+        """
+        Returns the rewiring of a reflector with a given index, as the arguments of swap_cross
+        or swap_loop, or None for index 0 (the reflector as it is).
+
+        Parameters:
+            reflector: the name of the reflector (str)
+            index: the index of the rewiring (int)
+        Returns: the kind of rewiring ("cross" or "loop") and the pair of letters (tuple), or None
+        """
+        if index == 0:
+            return None
+
+        wiring = REGISTRY.get(reflector).wiring
+        # each wire is identified by the first of the two letters it connects
+        wires = [chr(65 + i) for i, letter in enumerate(wiring) if chr(65 + i) < letter]
+        pairs = list(itertools.combinations(wires, 2))
+
+        kind, pair = divmod(index - 1, len(pairs))
+        return REWIRINGS[kind], pairs[pair]
+
+
+    def decode(self, key):
+        """
+        Turns a key into a machine configuration.
+
+        Parameters:
+            key: the key (int)
+        Returns: the rotors, reflector, ring settings, initial positions and reflector rewiring
+                 (see rewiring), as given to machine (tuple)
+        """
+        order, reflector, rewiring, rings, positions = self.digits(key)
+        reflector = self.reflectors[reflector]
+
+        return (" ".join(self.orders[order]),
+                reflector,
+                " ".join("%02d" % (ring + 1) for ring in rings),
+                " ".join(chr(65 + position) for position in positions),
+                self.rewiring(reflector, rewiring))
+
+
+    def machine(self, key, plugboard_pairs=[], compiled=False):
+        """
+        Builds the machine a key describes.
+
+        Parameters:
+            key: the key (int)
+            plugboard_pairs: plugboard pairs to be used, default is an empty list (list)
+            compiled: whether to encode using precomputed integer tables, default is False (bool)
+        Returns: the machine (EnigmaMachine)
+        """
+        rotors, reflector, ring_settings, initial_positions, rewiring = self.decode(key)
+
+        if rewiring is not None:
+            kind, pair = rewiring
+            swap = swap_cross if kind == "cross" else swap_loop
+            reflector = swap(REGISTRY.rotor(reflector), pair)
+
+        return EnigmaMachine(rotors, reflector, ring_settings, initial_positions, plugboard_pairs, compiled)
+
+
+    def shard(self, shard=0, shards=1):
+        """
+        Returns the range of keys one of <shards> workers is responsible for. The ranges of the
+        workers are contiguous, do not overlap and together cover the keyspace.
+
+        Parameters:
+            shard: the index of the worker, 0 to shards - 1, default is 0 (int)
+            shards: the number of workers, default is 1 (int)
+        Returns: the keys (range)
+        """
+        if not (isinstance(shard, int) and isinstance(shards, int)):
+            raise TypeError("Shards must be given as integers.")
+        if not 0 <= shard < shards:
+            raise ValueError("The shard must be between 0 and the number of shards - 1.")
+
+        return range(self.size * shard // shards, self.size * (shard + 1) // shards)
+
+
+    def signature(self):
+        """
+        Returns a description of the keyspace, stored in checkpoints so that a checkpoint is
+        never resumed over a different keyspace. (dict)
+        """
+        return {"rotors": list(self.rotors), "reflectors": list(self.reflectors), "slots": self.slots,
+                "ring_rotors": self.ring_rotors, "rewirings": self.rewirings, "size": self.size}
+
+
+    def keys(self, shard=0, shards=1, prune_block=None, prune_key=None,
+             checkpoint=None, checkpoint_every=100000):
+        """
+        Iterates over the keys of a shard of the keyspace, in increasing order.
+
+        Pruning predicates return True for the keys that should be skipped. prune_block is
+        called once for each wheel order, reflector and rewiring (with the rotor names, the
+        reflector name and the rewiring, see rewiring) and skips all the keys that share them;
+        prune_key is called for each remaining key with its digits (see digits).
+
+        With a checkpoint file, the iteration starts where the last one with the same
+        keyspace and shard left off, and the file is updated every <checkpoint_every> keys
+        and at the end. The keys handed out since the last update are handed out again
+        after a restart, so every key is processed at least once.
+
+        Parameters:
+            shard: the index of the worker, default is 0 (int)
+            shards: the number of workers, default is 1 (int)
+            prune_block: skips wheel orders, reflectors and rewirings, default is None (callable)
+            prune_key: skips single keys, default is None (callable)
+            checkpoint: the path of the checkpoint file, default is None (str)
+            checkpoint_every: the number of keys between checkpoints, default is 100000 (int)
+        Returns: a generator of keys (int)
+        """
+        keys = self.shard(shard, shards)
+        start = keys.start
+
+        if checkpoint is not None:
+            if checkpoint_every < 1:
+                raise ValueError("The number of keys between checkpoints must be positive.")
+            state = Keyspace.read_checkpoint(checkpoint)
+            if state is not None:
+                if (state["keyspace"] != self.signature()
+                        or (state["shard"], state["shards"]) != (shard, shards)):
+                    raise ValueError("The checkpoint belongs to a different keyspace or shard.")
+                start = state["next"]
+
+        return self.iterate(range(start, keys.stop), shard, shards, prune_block, prune_key,
+                            checkpoint, checkpoint_every)
+
+
+    def iterate(self, keys, shard, shards, prune_block, prune_key, checkpoint, checkpoint_every):
+        """
+        The generator behind keys (see keys for the parameters).
+
+        Parameters:
+            keys: the keys left to go through (range)
+        Returns: a generator of keys (int)
+        """
+        since_checkpoint = 0
+        key = keys.start
+
+        while key < keys.stop:
+            block = key // self.block_size
+            block_stop = min(keys.stop, (block + 1) * self.block_size)
+
+            if prune_block is not None:
+                order, rest = divmod(block, len(self.reflectors) * self.rewiring_count)
+                reflector, rewiring = divmod(rest, self.rewiring_count)
+                reflector = self.reflectors[reflector]
+                if prune_block(self.orders[order], reflector, self.rewiring(reflector, rewiring)):
+                    key = block_stop
+                    continue
+
+            while key < block_stop:
+                if prune_key is None or not prune_key(self.digits(key)):
+                    yield key
+
+                key += 1
+                since_checkpoint += 1
+                if checkpoint is not None and since_checkpoint >= checkpoint_every:
+                    Keyspace.write_checkpoint(checkpoint, self.signature(), shard, shards, key)
+                    since_checkpoint = 0
+
+        if checkpoint is not None:
+            Keyspace.write_checkpoint(checkpoint, self.signature(), shard, shards, keys.stop)
+
+
+    @staticmethod
+    def read_checkpoint(path):
+        """
+        Reads a checkpoint file, if it exists.
+
+        Parameters:
+            path: the path of the file (str)
+        Returns: the contents of the checkpoint (dict), or None if there is no file
+        """
+        if not os.path.exists(path):
+            return None
+
+        with open(path) as file:
+            return json.load(file)
+
+
+    @staticmethod
+    def write_checkpoint(path, signature, shard, shards, next_key):
+        """
+        Writes a checkpoint file. The file is replaced in one step, so it is never left
+        half-written if the process is stopped.
+
+        Parameters:
+            path: the path of the file (str)
+            signature: the keyspace's signature (dict)
+            shard: the index of the worker (int)
+            shards: the number of workers (int)
+            next_key: the first key that has not been handed out (int)
+        Returns: None
+        """
+        temporary = path + ".tmp"
+        with open(temporary, "w") as file:
+            json.dump({"keyspace": signature, "shard": shard, "shards": shards, "next": next_key}, file)
+        os.replace(temporary, path)
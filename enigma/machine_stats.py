@@ -0,0 +1,116 @@
+class MachineStats:
+    """
+    Defines:
+        - counters and cumulative times for the stages a character goes through in an
+        enigma machine (plugboard, rotors on the way in, reflector, rotors on the way out)
+        and for the stepping of the rotors
+        - methods that record events and return a snapshot of everything recorded
+    """
+
+    # the stages whose passes are counted and timed
+    STAGES = ("plugboard", "rotors_forward", "reflector", "rotors_backward", "scrambler_cache", "compiled")
+
+    def __init__(self):
+        """
+        Constructor. Creates a set of statistics with nothing recorded.
+        """
+        self.reset()
+
+
+    def reset(self):
+        """
+        Sets every counter and time back to 0.
+
+        Returns: None
+        """
+        self.characters = 0
+
+        # stage --> [number of passes, cumulative time in seconds]
+        self.stages = {stage: [0, 0.0] for stage in MachineStats.STAGES}
+
+        # key presses, and the time spent rotating the rotors
+        self.steps = 0
+        self.step_seconds = 0.0
+        # rotations of each rotor, right to left
+        self.rotations = [0, 0, 0, 0]
+        # rotations of the 2nd and 3rd rotors (caused by the rotor to their right reaching its notch)
+        self.turnovers = 0
+        # key presses on which the 2nd and 3rd rotors both rotate
+        self.double_steps = 0
+
+
+    def record(self, stage, seconds, count=1):
+        """
+        Records passes through a stage.
+
+        Parameters:
+            stage: the name of the stage, one of STAGES (str)
+            seconds: the time the passes took (float)
+            count: the number of passes, default is 1 (int)
+        Returns: None
+        """
+        totals = self.stages[stage]
+        totals[0] += count
+        totals[1] += seconds
+
+
+    def record_step(self, seconds, rotated):
+        """
+        Records a key press.
+
+        Parameters:
+            seconds: the time rotating the rotors took (float)
+            rotated: whether each rotor rotated, right to left (list of bool)
+        Returns: None
+        """
+        self.steps += 1
+        self.step_seconds += seconds
+
+        for i, rotation in enumerate(rotated):
+            self.rotations[i] += rotation
+
+        self.turnovers += sum(rotated[1:3])
+        if len(rotated) > 2 and rotated[1] and rotated[2]:
+            self.double_steps += 1
+
+
+    def record_steps(self, count, rotations, double_steps, seconds=0.0):
+        """
+        Records several key presses at once (e.g. those of the compiled engine, which are
+        counted rather than watched one at a time).
+
+        Parameters:
+            count: the number of key presses (int)
+            rotations: the rotations of each rotor, right to left (list of int)
+            double_steps: the number of key presses on which the 2nd and 3rd rotors both rotated (int)
+            seconds: the time rotating the rotors took, default is 0 (float)
+        Returns: None
+        """
+        self.steps += count
+        self.step_seconds += seconds
+
+        for i, rotation in enumerate(rotations):
+            self.rotations[i] += rotation
+
+        self.turnovers += sum(rotations[1:3])
+        self.double_steps += double_steps
+
+
+    def snapshot(self):
+        """
+        Returns everything recorded so far, as nested dictionaries of plain numbers. (dict)
+        """
+        snapshot = {"characters": self.characters}
+
+        for stage, (count, seconds) in self.stages.items():
+            snapshot[stage] = {"count": count, "seconds": seconds}
+
+        snapshot["stepping"] = {
+            "count": self.steps,
+            "seconds": self.step_seconds,
+            "rotations": list(self.rotations),
+            "turnovers": self.turnovers,
+            "double_steps": self.double_steps,
+        }
+
+        return snapshot
@@ -0,0 +1,74 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from enigma_machine import EnigmaMachine
+
+
+# texts shorter than this are not worth sending to other processes
+MIN_PARALLEL_LENGTH = 1 << 16
+
+# number of chunks given to each process, so that faster processes can pick up more work
+CHUNKS_PER_WORKER = 4
+
+
+def encode_chunk(config, state, offset, text):
+    """
+    Encodes one chunk of a message in a freshly built machine.
+
+    Parameters:
+        config: the configuration of the machine, as returned by EnigmaMachine.config (tuple)
+        state: the state of the rotors at the start of the message (tuple)
+        offset: the position of the chunk in the message (int)
+        text: the chunk to be encoded (str)
+    Returns: the encoded chunk (str)
+    """
+    machine = EnigmaMachine(*config, compiled=True)
+    machine.set_rotor_state(machine.advance_state(state, offset))
+
+    return machine.encode(text)
+
+
+def parallel_encode(machine, text, workers=None):
+    """
+    Encodes text with a pool of processes. Each process rebuilds the machine from its
+    configuration, moves the rotors to the start of its chunk and encodes the chunk;
+    the chunks are then joined in order.
+
+    Parameters:
+        machine: the machine whose configuration and current rotor state are used (EnigmaMachine)
+        text: the text to be encoded (str)
+        workers: the number of processes, default is the number of CPUs (int)
+    Returns: the encoded text (str)
+    """
+    if not isinstance(text, str):
+        raise TypeError("Text to be encoded must be a string.")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if not isinstance(workers, int):
+        raise TypeError("The number of workers must be an integer.")
+    if workers < 1:
+        raise ValueError("The number of workers must be positive.")
+
+    # in case non capital letters are given (every character moves the rotors once)
+    text = text.upper()
+
+    if workers == 1 or len(text) < MIN_PARALLEL_LENGTH:
+        return machine.encode(text)
+
+    config = machine.config()
+    state = machine.rotor_state()
+
+    chunk_size = -(-len(text) // (workers * CHUNKS_PER_WORKER))
+    offsets = range(0, len(text), chunk_size)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunks = executor.map(encode_chunk,
+                              [config] * len(offsets),
+                              [state] * len(offsets),
+                              offsets,
+                              [text[offset:offset + chunk_size] for offset in offsets])
+        result = "".join(chunks)
+
+    machine.set_rotor_state(machine.advance_state(state, len(text)))
+
+    return result
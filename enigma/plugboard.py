@@ -1,3 +1,6 @@
+from pluglead import PlugLead
+
+
 class Plugboard:
     """
     Plugboard: contains all the pluglead configurations for a specific enigma machine.
@@ -11,6 +14,12 @@ class Plugboard:
         """
         self.leads = []
 
+        # the combined effect of the leads, applied one after the other:
+        # character --> character it ends up as (characters that end up as themselves are left out)
+        self.mapping = {}
+        # character it ends up as --> character
+        self.inverse = {}
+
 
     def add(self, lead):
         """
@@ -29,6 +38,70 @@ class Plugboard:
             raise ValueError("Cannot add any more leads to the plugboard.")
 
         self.leads.append(lead)
+        self.compose(lead)
+
+
+    def remove(self, lead):
+        """
+        Removes a lead from the plugboard.
+
+        Parameters:
+            lead: the lead to remove, which must be on the plugboard (PlugLead)
+        Returns: None
+        """
+        if not isinstance(lead, PlugLead):
+            raise TypeError("You can only remove plug leads from the plugboard.")
+
+        index = next((i for i, other in enumerate(self.leads) if other is lead), None)
+        if index is None:
+            raise ValueError("This lead is not on the plugboard.")
+
+        del self.leads[index]
+
+        if index == len(self.leads):
+            # the last lead was applied last, and a lead undoes itself
+            self.compose(lead)
+        else:
+            # leads can share characters, so the ones after it have to be applied again
+            self.mapping = {}
+            self.inverse = {}
+            for other in self.leads:
+                self.compose(other)
+
+
+    def compose(self, lead):
+        """
+        Applies a lead after the ones already combined in the mapping.
+
+        Parameters:
+            lead: the lead to apply (PlugLead)
+        Returns: None
+        """
+        first, second = lead.mapping_dict.keys()
+
+        # the characters that currently end up as the lead's two characters swap results
+        first_source = self.inverse.get(first, first)
+        second_source = self.inverse.get(second, second)
+
+        for source, result in ((first_source, second), (second_source, first)):
+            if source == result:
+                self.mapping.pop(source, None)
+                self.inverse.pop(result, None)
+            else:
+                self.mapping[source] = result
+                self.inverse[result] = source
+
+
+    def clone(self):
+        """
+        Returns a copy of the plugboard, with the same leads. (Plugboard)
+        """
+        plugboard = Plugboard()
+        plugboard.leads = list(self.leads)
+        plugboard.mapping = dict(self.mapping)
+        plugboard.inverse = dict(self.inverse)
+
+        return plugboard
 
 
     def encode(self, character):
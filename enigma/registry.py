@@ -0,0 +1,267 @@
+import json
+import os
+
+from rotor import Rotor
+
+
+# the data file the default catalogue is loaded from
+DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rotors.json")
+
+ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+# number of rows in a shift table: positions go from 0 to 25, but a rotor whose
+# initial position equals its ring setting starts at position 26 (which encodes like 0)
+POSITIONS = 27
+
+
+class WiringData:
+    """
+    Defines:
+        - a wiring together with every lookup table derived from it. There is one for each
+        distinct wiring (see intern_wiring), shared by the catalogue, the rotors and every
+        engine and encoder, so each table exists once
+        - the index tables (forward and inverse), computed when the wiring is interned
+        - the shift tables of the compiled engine and their NumPy versions (used by the bulk
+        and batch encoders), built the first time they are asked for
+    """
+
+    __slots__ = ("letters", "forward", "inverse", "shifts", "arrays")
+
+    def __init__(self, letters):
+        """
+        Constructor. Computes the index tables of a wiring.
+
+        Parameters:
+            letters: the letter each letter A-Z is wired to (tuple of str)
+        """
+        self.letters = letters
+
+        self.forward = tuple(ord(letter) - 65 for letter in letters)
+        inverse = [0] * 26
+        for i, j in enumerate(self.forward):
+            inverse[j] = i
+        self.inverse = tuple(inverse)
+
+        self.shifts = None
+        self.arrays = None
+
+
+    def shift_tables(self):
+        """
+        Returns the right to left and left to right shift tables of the wiring: table[position][index]
+        is the index of the letter that comes out of the rotor when the letter <index> goes in
+        while the rotor is at <position>. They are immutable (tuples of tuples).
+
+        Returns: the two tables, each with POSITIONS rows of 26 (tuple)
+        """
+        if self.shifts is None:
+            self.shifts = tuple(tuple(tuple((table[(index + position) % 26] - position) % 26 for index in range(26))
+                                      for position in range(POSITIONS))
+                                for table in (self.forward, self.inverse))
+
+        return self.shifts
+
+
+    def shift_arrays(self):
+        """
+        Returns the shift tables (see shift_tables) as read-only NumPy arrays. (tuple)
+        """
+        if self.arrays is None:
+            # NumPy is only needed by the encoders that use these arrays
+            import numpy as np
+
+            arrays = tuple(np.array(table) for table in self.shift_tables())
+            for array in arrays:
+                array.flags.writeable = False
+            self.arrays = arrays
+
+        return self.arrays
+
+
+# wiring (str) --> its tables (WiringData), see intern_wiring; starting with the wirings of
+# the rotors that can be created by number, so that the catalogue's rotors share their tuples
+INTERNED_WIRINGS = {"".join(wiring): WiringData(wiring) for wiring, _ in Rotor._POSSIBLE_ROTORS.values()}
+
+
+def intern_wiring(wiring):
+    """
+    Returns the one WiringData of a wiring, creating it the first time the wiring is seen.
+
+    Parameters:
+        wiring: the letter each letter A-Z is wired to (str or sequence of str)
+    Returns: the wiring's tables (WiringData)
+    """
+    key = "".join(wiring)
+
+    data = INTERNED_WIRINGS.get(key)
+    if data is None:
+        data = INTERNED_WIRINGS[key] = WiringData(tuple(key))
+
+    return data
+
+
+class RotorDefinition:
+    """
+    Defines:
+        - an entry of the rotor catalogue: a named wiring with its notch (if any), and whether
+        it is a reflector
+        - its wiring's lookup tables (see WiringData), shared by every definition with the
+        same wiring and by every rotor and engine that uses it
+    """
+
+    __slots__ = ("name", "wiring", "notch", "reflector", "tables")
+
+    def __init__(self, name, wiring, notch=None, reflector=False):
+        """
+        Constructor. Checks a definition and looks up the tables of its wiring.
+
+        Parameters:
+            name: the name of the rotor, e.g. I or B-thin (str)
+            wiring: the letter each letter A-Z is wired to (str or sequence of str)
+            notch: the letter of the notch, default is None (no notch) (str)
+            reflector: whether the rotor is a reflector, default is False (bool)
+        """
+        if not isinstance(name, str):
+            raise TypeError("The name of the rotor must be a string.")
+        # machines are configured with the names of their rotors separated by spaces
+        if len(name.split()) != 1 or name.strip() != name:
+            raise ValueError("The name of the rotor must be a single word.")
+
+        wiring = "".join(wiring).upper()
+        if sorted(wiring) != list(ALPHABET):
+            raise ValueError("A wiring must contain every letter A-Z exactly once.")
+
+        if notch is not None:
+            if not (isinstance(notch, str) and len(notch) == 1 and notch.upper() in ALPHABET):
+                raise ValueError("The notch must be a single letter.")
+            notch = notch.upper()
+
+        if reflector:
+            if notch is not None:
+                raise ValueError("A reflector cannot have a notch.")
+            # a reflector connects letters in pairs: it is its own inverse and maps no letter to itself
+            for i, letter in enumerate(wiring):
+                if letter == ALPHABET[i] or wiring[ord(letter) - 65] != ALPHABET[i]:
+                    raise ValueError("A reflector must connect the letters in 13 pairs.")
+
+        self.name = name
+        self.tables = intern_wiring(wiring)
+        # definitions with the same wiring share it (and rotors built from them too)
+        self.wiring = self.tables.letters
+        self.notch = notch
+        self.reflector = bool(reflector)
+
+
+class RotorRegistry:
+    """
+    Defines:
+        - a catalogue of rotors and reflectors, looked up by name (case insensitive)
+        - methods that register new definitions and build rotors from them
+    """
+
+    def __init__(self):
+        """
+        Constructor. Creates an empty catalogue.
+        """
+        # upper case name --> definition
+        self.definitions = {}
+
+
+    def register(self, name, wiring, notch=None, reflector=False, replace=False):
+        """
+        Adds a rotor (or reflector) to the catalogue.
+
+        Parameters:
+            name: the name of the rotor (str)
+            wiring: the letter each letter A-Z is wired to (str or sequence of str)
+            notch: the letter of the notch, default is None (no notch) (str)
+            reflector: whether the rotor is a reflector, default is False (bool)
+            replace: whether an existing rotor with the same name may be replaced, default is False (bool)
+        Returns: the new definition (RotorDefinition)
+        """
+        definition = RotorDefinition(name, wiring, notch, reflector)
+
+        key = name.upper()
+        if key in self.definitions and not replace:
+            raise ValueError("There is already a rotor with this name.")
+
+        self.definitions[key] = definition
+
+        return definition
+
+
+    def load(self, path):
+        """
+        Adds the rotors listed in a JSON file: a list of objects with a "name", a "wiring",
+        and optionally a "notch" and whether it is a "reflector".
+
+        Parameters:
+            path: the path of the file (str)
+        Returns: None
+        """
+        with open(path) as file:
+            entries = json.load(file)
+
+        for entry in entries:
+            self.register(entry["name"], entry["wiring"], entry.get("notch"), entry.get("reflector", False))
+
+
+    def get(self, name):
+        """
+        Returns the definition of a rotor. (RotorDefinition)
+
+        Parameters:
+            name: the name of the rotor (str)
+        """
+        if not isinstance(name, str):
+            raise TypeError("The name of the rotor must be a string.")
+
+        definition = self.definitions.get(name.upper())
+        if definition is None:
+            raise KeyError("There is no such rotor.")
+
+        return definition
+
+
+    def rotor(self, name):
+        """
+        Returns a new rotor with the wiring and notch of a catalogue entry. (Rotor)
+
+        Parameters:
+            name: the name of the rotor (str)
+        """
+        definition = self.get(name)
+        return Rotor.from_wiring(definition.wiring, definition.notch)
+
+
+    def names(self, reflectors=None):
+        """
+        Returns the names of the rotors in the catalogue, in the order they were registered. (list)
+
+        Parameters:
+            reflectors: True for reflectors only, False for rotors only, default is None (both) (bool)
+        """
+        return [definition.name for definition in self.definitions.values()
+                if reflectors is None or definition.reflector == reflectors]
+
+
+# the catalogue rotor_from_name looks rotors up in
+REGISTRY = RotorRegistry()
+REGISTRY.load(DATA_FILE)
+
+
+def register_rotor(name, wiring, notch=None, reflector=False, replace=False):
+    """
+    Adds a rotor (or reflector) to the default catalogue, so that machines can be created
+    with it by name. The wiring of a reflector changed by swap_cross or swap_loop can be
+    registered as a new reflector.
+
+    Parameters:
+        name: the name of the rotor (str)
+        wiring: the letter each letter A-Z is wired to (str or sequence of str)
+        notch: the letter of the notch, default is None (no notch) (str)
+        reflector: whether the rotor is a reflector, default is False (bool)
+        replace: whether an existing rotor with the same name may be replaced, default is False (bool)
+    Returns: the new definition (RotorDefinition)
+    """
+    return REGISTRY.register(name, wiring, notch, reflector, replace)
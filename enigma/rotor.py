@@ -5,20 +5,23 @@ class Rotor:
     - the functions needed to encode characters (R-->L, L-->R) using the rotor
     """
 
+    # the state of a rotor is kept in slots rather than in an instance dictionary
+    __slots__ = ("wiring", "notch", "initial_position", "ring_setting", "position", "turns_until_notch")
+
     # dictionary of 10 possible wirings and their notches
     # each key corresponds to a tuple (wiring, notch)
-    # or each wiring, the nth element of the list corresponds to the nth letter of the english alphabet
+    # or each wiring, the nth element of the tuple corresponds to the nth letter of the english alphabet
     _POSSIBLE_ROTORS = {
-        0: (['L', 'E', 'Y', 'J', 'V', 'C', 'N', 'I', 'X', 'W', 'P', 'B', 'Q', 'M', 'D', 'R', 'T', 'A', 'K', 'Z', 'G', 'F', 'U', 'H', 'O', 'S'], None),
-        1: (['F', 'S', 'O', 'K', 'A', 'N', 'U', 'E', 'R', 'H', 'M', 'B', 'T', 'I', 'Y', 'C', 'W', 'L', 'Q', 'P', 'Z', 'X', 'V', 'G', 'J', 'D'], None),
-        2: (['E', 'K', 'M', 'F', 'L', 'G', 'D', 'Q', 'V', 'Z', 'N', 'T', 'O', 'W', 'Y', 'H', 'X', 'U', 'S', 'P', 'A', 'I', 'B', 'R', 'C', 'J'], 'Q'),
-        3: (['A', 'J', 'D', 'K', 'S', 'I', 'R', 'U', 'X', 'B', 'L', 'H', 'W', 'T', 'M', 'C', 'Q', 'G', 'Z', 'N', 'P', 'Y', 'F', 'V', 'O', 'E'], 'E'),
-        4: (['B', 'D', 'F', 'H', 'J', 'L', 'C', 'P', 'R', 'T', 'X', 'V', 'Z', 'N', 'Y', 'E', 'I', 'W', 'G', 'A', 'K', 'M', 'U', 'S', 'Q', 'O'], 'V'),
-        5: (['E', 'S', 'O', 'V', 'P', 'Z', 'J', 'A', 'Y', 'Q', 'U', 'I', 'R', 'H', 'X', 'L', 'N', 'F', 'T', 'G', 'K', 'D', 'C', 'M', 'W', 'B'], 'J'),
-        6: (['V', 'Z', 'B', 'R', 'G', 'I', 'T', 'Y', 'U', 'P', 'S', 'D', 'N', 'H', 'L', 'X', 'A', 'W', 'M', 'J', 'Q', 'O', 'F', 'E', 'C', 'K'], 'Z'),
-        7: (['E', 'J', 'M', 'Z', 'A', 'L', 'Y', 'X', 'V', 'B', 'W', 'F', 'C', 'R', 'Q', 'U', 'O', 'N', 'T', 'S', 'P', 'I', 'K', 'H', 'G', 'D'], None),
-        8: (['Y', 'R', 'U', 'H', 'Q', 'S', 'L', 'D', 'P', 'X', 'N', 'G', 'O', 'K', 'M', 'I', 'E', 'B', 'F', 'Z', 'C', 'W', 'V', 'J', 'A', 'T'], None),
-        9: (['F', 'V', 'P', 'J', 'I', 'A', 'O', 'Y', 'E', 'D', 'R', 'Z', 'X', 'W', 'G', 'C', 'T', 'K', 'U', 'Q', 'S', 'B', 'N', 'M', 'H', 'L'], None)
+        0: (('L', 'E', 'Y', 'J', 'V', 'C', 'N', 'I', 'X', 'W', 'P', 'B', 'Q', 'M', 'D', 'R', 'T', 'A', 'K', 'Z', 'G', 'F', 'U', 'H', 'O', 'S'), None),
+        1: (('F', 'S', 'O', 'K', 'A', 'N', 'U', 'E', 'R', 'H', 'M', 'B', 'T', 'I', 'Y', 'C', 'W', 'L', 'Q', 'P', 'Z', 'X', 'V', 'G', 'J', 'D'), None),
+        2: (('E', 'K', 'M', 'F', 'L', 'G', 'D', 'Q', 'V', 'Z', 'N', 'T', 'O', 'W', 'Y', 'H', 'X', 'U', 'S', 'P', 'A', 'I', 'B', 'R', 'C', 'J'), 'Q'),
+        3: (('A', 'J', 'D', 'K', 'S', 'I', 'R', 'U', 'X', 'B', 'L', 'H', 'W', 'T', 'M', 'C', 'Q', 'G', 'Z', 'N', 'P', 'Y', 'F', 'V', 'O', 'E'), 'E'),
+        4: (('B', 'D', 'F', 'H', 'J', 'L', 'C', 'P', 'R', 'T', 'X', 'V', 'Z', 'N', 'Y', 'E', 'I', 'W', 'G', 'A', 'K', 'M', 'U', 'S', 'Q', 'O'), 'V'),
+        5: (('E', 'S', 'O', 'V', 'P', 'Z', 'J', 'A', 'Y', 'Q', 'U', 'I', 'R', 'H', 'X', 'L', 'N', 'F', 'T', 'G', 'K', 'D', 'C', 'M', 'W', 'B'), 'J'),
+        6: (('V', 'Z', 'B', 'R', 'G', 'I', 'T', 'Y', 'U', 'P', 'S', 'D', 'N', 'H', 'L', 'X', 'A', 'W', 'M', 'J', 'Q', 'O', 'F', 'E', 'C', 'K'), 'Z'),
+        7: (('E', 'J', 'M', 'Z', 'A', 'L', 'Y', 'X', 'V', 'B', 'W', 'F', 'C', 'R', 'Q', 'U', 'O', 'N', 'T', 'S', 'P', 'I', 'K', 'H', 'G', 'D'), None),
+        8: (('Y', 'R', 'U', 'H', 'Q', 'S', 'L', 'D', 'P', 'X', 'N', 'G', 'O', 'K', 'M', 'I', 'E', 'B', 'F', 'Z', 'C', 'W', 'V', 'J', 'A', 'T'), None),
+        9: (('F', 'V', 'P', 'J', 'I', 'A', 'O', 'Y', 'E', 'D', 'R', 'Z', 'X', 'W', 'G', 'C', 'T', 'K', 'U', 'Q', 'S', 'B', 'N', 'M', 'H', 'L'), None)
     }
 
     def __init__(self, wiring):
@@ -31,7 +34,8 @@ class Rotor:
         if not(isinstance(wiring, int)):
             raise TypeError("Wiring must be an integer.")
 
-        self.wiring = copy.deepcopy(self._POSSIBLE_ROTORS[wiring][0])
+        # wirings are immutable tuples, shared by every rotor of the same kind
+        self.wiring = self._POSSIBLE_ROTORS[wiring][0]
         self.notch = self._POSSIBLE_ROTORS[wiring][1]
 
         # default values
@@ -41,6 +45,44 @@ class Rotor:
         self.turns_until_notch = 0
    
 
+    def clone(self):
+        """
+        Returns a copy of the rotor in its current state, sharing its wiring. (Rotor)
+        """
+        rotor = Rotor.__new__(Rotor)
+        rotor.wiring = self.wiring
+        rotor.notch = self.notch
+        rotor.initial_position = self.initial_position
+        rotor.ring_setting = self.ring_setting
+        rotor.position = self.position
+        rotor.turns_until_notch = self.turns_until_notch
+
+        return rotor
+
+
+    @classmethod
+    def from_wiring(cls, wiring, notch=None):
+        """
+        Creates a rotor with any wiring, e.g. one from the rotor catalogue (see registry).
+
+        Parameters:
+            wiring: the letter each letter A-Z is wired to (tuple of str, shared, not copied)
+            notch: the letter of the notch, default is None (no notch) (str)
+        Returns: the rotor (Rotor)
+        """
+        rotor = cls.__new__(cls)
+        rotor.wiring = wiring
+        rotor.notch = notch
+
+        # default values
+        rotor.initial_position = 'A'
+        rotor.ring_setting = 0
+        rotor.position = 0
+        rotor.turns_until_notch = 0
+
+        return rotor
+
+
     # METHODS TO CONFIGURE ROTOR OBJECTS
 
     def set_initial_position(self, initial_position):
@@ -121,64 +163,80 @@ class Rotor:
 
     # INSTANCE METHODS
 
-    def encode_right_to_left(self, character, rotate=True):
+    def encode_right_to_left(self, character, rotate=True, validate=True):
         """
         Encodes a character from right to left.
 
         Parameters:
             character: the character to encode (str)
+            rotate: whether to rotate the rotor first, default is True (bool)
+            validate: whether to check the character, default is True; only pass False
+                      if the caller has already checked it (bool)
         Returns: the encoded character (str)
         """
-        if not isinstance(character, str):
-            raise TypeError("Character to be encoded must be a string.")
-        if len(character) != 1:
-            raise ValueError("Character to be encoded must be a single character.")
+        if validate:
+            if not isinstance(character, str):
+                raise TypeError("Character to be encoded must be a string.")
+            if len(character) != 1:
+                raise ValueError("Character to be encoded must be a single character.")
 
         if rotate:
-
-            if self.has_notch():
-                # one rotation closer to hitting the notch
-                self.dec_turns_until_notch()
-            # rotate rotor
-            self.increase_position()
+            self.rotate()
        
         # shift the input character <position> positions to the right in the alphabet
-        shifted_char_pos = Rotor.shift_input(character, self.position)
+        shifted_char_pos = Rotor.shift_input(character, self.position, validate)
         # get the character that corresponds to the shifted character in the rotor's wiring
         corresponding_char = self.wiring[shifted_char_pos]
         # shift the corresponding character <position> positions to the left in the alphabet
-        shifted_output_pos = Rotor.shift_output(corresponding_char, self.position)
+        shifted_output_pos = Rotor.shift_output(corresponding_char, self.position, validate)
         # get the shifted character from its position
-        shifted_output = Rotor.get_char_from_pos(shifted_output_pos)
+        shifted_output = Rotor.get_char_from_pos(shifted_output_pos, validate)
 
         return shifted_output
 
 
-    def encode_left_to_right(self, character):
+    def encode_left_to_right(self, character, validate=True):
         """
         Encodes a character from left to right.
 
         Parameters:
             character: the character to encode (str)
+            validate: whether to check the character, default is True; only pass False
+                      if the caller has already checked it (bool)
         Returns: the encoded character (str)
         """
-        if not isinstance(character, str):
-            raise TypeError("Character to be encoded must be a string.")
-        if len(character) != 1:
-            raise ValueError("Character to be encoded must be a single character.")
+        if validate:
+            if not isinstance(character, str):
+                raise TypeError("Character to be encoded must be a string.")
+            if len(character) != 1:
+                raise ValueError("Character to be encoded must be a single character.")
 
         # shift the input character <position> positions to the right in the alphabet
-        shifted_char_pos = Rotor.shift_input(character, self.position)
+        shifted_char_pos = Rotor.shift_input(character, self.position, validate)
         # get the character that corresponds to the shifted character in the rotor's wiring
-        corresponding_char = Rotor.get_char_from_pos(self.wiring.index(Rotor.get_char_from_pos(shifted_char_pos)))
+        corresponding_char = Rotor.get_char_from_pos(self.wiring.index(Rotor.get_char_from_pos(shifted_char_pos, validate)),
+                                                     validate)
         # shift the corresponding character <position> positions to the left in the alphabet
-        shifted_output_pos = Rotor.shift_output(corresponding_char, self.position)
+        shifted_output_pos = Rotor.shift_output(corresponding_char, self.position, validate)
         # get the shifted character from its position
-        shifted_output = Rotor.get_char_from_pos(shifted_output_pos)
+        shifted_output = Rotor.get_char_from_pos(shifted_output_pos, validate)
        
         return shifted_output
 
 
+    def rotate(self):
+        """
+        Rotates the rotor by one position, bringing it one rotation closer to its notch.
+
+        Returns: None
+        """
+        if self.has_notch():
+            # one rotation closer to hitting the notch
+            self.dec_turns_until_notch()
+        # rotate rotor
+        self.increase_position()
+
+
     def has_notch(self):
         """
         Returns whether or not the rotor has a notch. (bool)
@@ -225,7 +283,57 @@ class Rotor:
     # STATIC METHODS
 
     @staticmethod
-    def shift_input(character, position):
+    def position_after(position, rotations):
+        """
+        Calculates the position of a rotor after it has rotated a number of times,
+        without rotating it one position at a time (see increase_position).
+
+        Parameters:
+            position: the current position (int, 0-26)
+            rotations: the number of rotations (int)
+        Returns: the position after the rotations (int)
+        """
+        if rotations == 0:
+            return position
+        # a rotor at position 26 stays on the same letter during its first rotation
+        if position == 26:
+            return (rotations - 1) % 26
+        return (position + rotations) % 26
+
+
+    @staticmethod
+    def turns_after(turns_until_notch, rotations):
+        """
+        Calculates the turns until a rotor reaches its notch after it has rotated a number
+        of times, without rotating it one position at a time (see dec_turns_until_notch).
+
+        Parameters:
+            turns_until_notch: the current turns until notch (int, or None if there is no notch)
+            rotations: the number of rotations (int)
+        Returns: the turns until notch after the rotations (int, or None if there is no notch)
+        """
+        if turns_until_notch is None or rotations == 0:
+            return turns_until_notch
+
+        first = Rotor.rotations_until_notch(turns_until_notch)
+        if rotations < first:
+            return first - rotations
+        return (first - rotations) % 26
+
+
+    @staticmethod
+    def rotations_until_notch(turns_until_notch):
+        """
+        Returns the number of rotations it takes a rotor to next reach its notch. (int)
+        A rotor that is already at its notch needs a full revolution.
+        """
+        if turns_until_notch > 0:
+            return turns_until_notch
+        return 26
+
+
+    @staticmethod
+    def shift_input(character, position, validate=True):
         """
         Shifts a character to the right in the alphabet by <position> positions.
         If the shift takes it out of the alphabet's range (i.e. after Z),
@@ -234,13 +342,15 @@ class Rotor:
         Parameters:
             character: the character to be shifted (str)
             position: the number of positions to shift by (int)
+            validate: whether to check the character, default is True (bool)
 
         Returns: the index of the shifted character in the alphabet. (int)
         """
-        if not isinstance(character, str):
-            raise TypeError("Character to be shifted must be a string.")
-        if len(character) != 1:
-            raise TypeError("Character to be shifted must be a single character.")
+        if validate:
+            if not isinstance(character, str):
+                raise TypeError("Character to be shifted must be a string.")
+            if len(character) != 1:
+                raise TypeError("Character to be shifted must be a single character.")
 
         if ord(character) + position > 90:
             wraparound_char = 65 % (65 - (position - (90 - ord(character)) - 1))
@@ -254,7 +364,7 @@ class Rotor:
 
 
     @staticmethod
-    def shift_output(character, position):
+    def shift_output(character, position, validate=True):
         """
         Shifts a character to the left in the alphabet by <position> positions.
         If the shift takes it out of the alphabet's range (i.e. before A),
@@ -263,13 +373,15 @@ class Rotor:
         Parameters:
             character: the character to be shifted (str)
             position: the number of positions to shift by (int)
+            validate: whether to check the character, default is True (bool)
 
         Returns: the index of the shifted character in the alphabet. (int)
         """
-        if not isinstance(character, str):
-            raise TypeError("Character to be shifted must be a string.")
-        if len(character) != 1:
-            raise TypeError("Character to be shifted must be a single character.")
+        if validate:
+            if not isinstance(character, str):
+                raise TypeError("Character to be shifted must be a string.")
+            if len(character) != 1:
+                raise TypeError("Character to be shifted must be a single character.")
 
         if ord(character) - position < 65:
             # the character reached if we shift <position> steps to the left
@@ -289,11 +401,16 @@ class Rotor:
 
 
     @staticmethod
-    def get_char_from_pos(position):
+    def get_char_from_pos(position, validate=True):
         """
         Returns the character that corresponds to a certain position in the alphabet. (str)
+
+        Parameters:
+            position: the position in the alphabet (int)
+            validate: whether to check the type of the position, default is True;
+                      the bounds are always checked (bool)
         """
-        if not isinstance(position, int):
+        if validate and not isinstance(position, int):
             raise TypeError("Position must be an integer.")
         if not 0 <= position <= 25:
             raise IndexError("Position is out of bounds (0-25).")
@@ -0,0 +1,404 @@
+import argparse
+import math
+import os
+import struct
+
+import numpy as np
+
+
+# relative frequencies of the letters A-Z in English text (percent)
+ENGLISH_FREQUENCIES = [8.2, 1.5, 2.8, 4.3, 12.7, 2.2, 2.0, 6.1, 7.0, 0.15, 0.77, 4.0, 2.4,
+                       6.7, 7.5, 1.9, 0.095, 6.0, 6.3, 9.1, 2.8, 0.98, 2.4, 0.15, 2.0, 0.074]
+
+# table files start with this, followed by n and a reserved field (two little endian uint32),
+# then the 26^n log probabilities as little endian float32
+TABLE_MAGIC = b"NGRAMS\x00\x01"
+TABLE_HEADER = struct.Struct("<8sII")
+
+# the n-gram lengths build_tables writes a table for
+TABLE_SIZES = (1, 2, 3, 4)
+
+
+def letters_to_codes(text):
+    """
+    Turns text into the alphabetical indices of its letters (anything else is left out).
+
+    Parameters:
+        text: the text (str)
+    Returns: the alphabetical indices, 0-25 (numpy array)
+    """
+    if not isinstance(text, str):
+        raise TypeError("Text must be a string.")
+
+    codes = np.frombuffer(text.upper().encode("ascii", "ignore"), dtype=np.uint8).astype(np.int64) - 65
+    return codes[(codes >= 0) & (codes <= 25)]
+
+
+def codes_to_letters(codes):
+    """
+    Turns alphabetical indices back into capital letters.
+
+    Parameters:
+        codes: the alphabetical indices, 0-25 (numpy array)
+    Returns: the letters (str)
+    """
+    return (np.asarray(codes) + 65).astype(np.uint8).tobytes().decode("ascii")
+
+
+def ngram_table(corpus, n):
+    """
+    Builds a table of the log probabilities of the n-grams (sequences of n letters) of a corpus.
+    N-grams that never appear in the corpus are given a small probability.
+
+    Parameters:
+        corpus: a sample of the language of the plaintexts (str)
+        n: the length of the n-grams (int)
+    Returns: the log probabilities, indexed by the n-gram read as a base 26 number (numpy array)
+    """
+    codes = letters_to_codes(corpus)
+    if len(codes) < n:
+        raise ValueError("The corpus is too short.")
+
+    indices = np.zeros(len(codes) - n + 1, dtype=np.int64)
+    for i in range(n):
+        indices = indices * 26 + codes[i:len(codes) - n + 1 + i]
+
+    counts = np.bincount(indices, minlength=26 ** n)
+    return np.log(np.maximum(counts, 0.01) / len(indices))
+
+
+def save_table(path, table):
+    """
+    Writes an n-gram table to a binary file that load_table can map into memory.
+
+    Parameters:
+        path: the path of the file (str)
+        table: the log probabilities of the n-grams, see ngram_table (numpy array)
+    Returns: None
+    """
+    table = np.asarray(table)
+    n = round(math.log(len(table), 26))
+    if 26 ** n != len(table):
+        raise ValueError("The table must have an entry for each n-gram (26^n entries).")
+
+    with open(path, "wb") as file:
+        file.write(TABLE_HEADER.pack(TABLE_MAGIC, n, 0))
+        file.write(table.astype("<f4").tobytes())
+
+
+def load_table(path):
+    """
+    Maps an n-gram table written by save_table into memory. Nothing is parsed or copied:
+    the operating system reads the pages of the file as they are used, and processes that
+    load the same file share them.
+
+    Parameters:
+        path: the path of the file (str)
+    Returns: the log probabilities of the n-grams (read only numpy memmap of float32)
+    """
+    with open(path, "rb") as file:
+        header = file.read(TABLE_HEADER.size)
+
+    if len(header) != TABLE_HEADER.size:
+        raise ValueError("The file is not an n-gram table.")
+    magic, n, _ = TABLE_HEADER.unpack(header)
+    if magic != TABLE_MAGIC or not 1 <= n <= 6:
+        raise ValueError("The file is not an n-gram table.")
+    if os.path.getsize(path) != TABLE_HEADER.size + 4 * 26 ** n:
+        raise ValueError("The n-gram table is truncated.")
+
+    return np.memmap(path, dtype="<f4", mode="r", offset=TABLE_HEADER.size, shape=(26 ** n,))
+
+
+def table_path(directory, n):
+    """
+    Returns the path build_tables writes the table of n-grams of length n to. (str)
+
+    Parameters:
+        directory: the directory of the tables (str)
+        n: the length of the n-grams (int)
+    """
+    return os.path.join(directory, f"{n}grams.bin")
+
+
+def build_tables(corpus, directory, sizes=TABLE_SIZES):
+    """
+    Builds the monogram, bigram, trigram and quadgram tables of a corpus and saves them.
+
+    Parameters:
+        corpus: a sample of the language of the plaintexts (str)
+        directory: the directory the tables are written to (str)
+        sizes: the n-gram lengths, default is 1 to 4 (sequence of int)
+    Returns: the paths of the tables (list of str)
+    """
+    os.makedirs(directory, exist_ok=True)
+
+    paths = []
+    for n in sizes:
+        path = table_path(directory, n)
+        save_table(path, ngram_table(corpus, n))
+        paths.append(path)
+
+    return paths
+
+
+def load_scorers(directory, sizes=TABLE_SIZES):
+    """
+    Loads the tables written by build_tables.
+
+    Parameters:
+        directory: the directory of the tables (str)
+        sizes: the n-gram lengths, default is 1 to 4 (sequence of int)
+    Returns: n --> scorer (dict)
+    """
+    return {n: NgramScorer(load_table(table_path(directory, n))) for n in sizes}
+
+
+class NgramScorer:
+    """
+    Defines:
+        - a language model made of the log probabilities of n-grams
+        - methods that score texts with it (higher is more likely to be plaintext),
+        many texts at once or one text as it changes (see IncrementalScore)
+    """
+
+    def __init__(self, table):
+        """
+        Constructor.
+
+        Parameters:
+            table: the log probabilities of the n-grams, see ngram_table and load_table (numpy array)
+        """
+        # float32 tables (and memory mapped ones) are used as they are, not copied
+        if not (isinstance(table, np.ndarray) and np.issubdtype(table.dtype, np.floating)):
+            table = np.asarray(table, dtype=np.float64)
+
+        self.table = table
+        self.n = round(math.log(len(self.table), 26))
+
+        if 26 ** self.n != len(self.table):
+            raise ValueError("The table must have an entry for each n-gram (26^n entries).")
+
+
+    @classmethod
+    def load(cls, path):
+        """
+        Creates a scorer from a table file written by save_table. (NgramScorer)
+
+        Parameters:
+            path: the path of the file (str)
+        """
+        return cls(load_table(path))
+
+
+    def indices(self, codes):
+        """
+        Reads the n-grams of texts as base 26 numbers (the indices of their table entries).
+
+        Parameters:
+            codes: the texts as alphabetical indices, one text per row (numpy array, shape (texts, length))
+        Returns: the n-grams of each text (numpy array, shape (texts, length - n + 1))
+        """
+        length = codes.shape[1] - self.n + 1
+
+        indices = np.zeros((codes.shape[0], max(length, 0)), dtype=np.int64)
+        if length < 1:
+            return indices
+
+        for i in range(self.n):
+            indices = indices * 26 + codes[:, i:i + length]
+
+        return indices
+
+
+    def score(self, codes):
+        """
+        Scores texts by the sum of the log probabilities of their n-grams.
+
+        Parameters:
+            codes: the texts as alphabetical indices, one text per row (numpy array, shape (texts, length))
+        Returns: the score of each text (numpy array)
+        """
+        codes = np.atleast_2d(codes)
+        if codes.shape[1] < self.n:
+            return np.zeros(codes.shape[0])
+
+        return self.table[self.indices(codes)].sum(axis=1, dtype=np.float64)
+
+
+    def __call__(self, codes):
+        """
+        Scores texts (see score), so that a scorer can be passed wherever a scoring function is expected.
+        """
+        return self.score(codes)
+
+
+    def incremental(self, codes):
+        """
+        Returns the score of a text that can be updated as a few of its letters change. (IncrementalScore)
+
+        Parameters:
+            codes: the text as alphabetical indices (numpy array)
+        """
+        return IncrementalScore(self, codes)
+
+
+class IncrementalScore:
+    """
+    Defines:
+        - the n-gram score of one text, together with the contribution of each n-gram
+        - methods that rescore the text when some of its letters change, looking only at the
+        n-grams that contain them (e.g. the letters a trial plugboard pair affects), for
+        one change or for many alternative changes at once
+    """
+
+    def __init__(self, scorer, codes):
+        """
+        Constructor. Scores a text.
+
+        Parameters:
+            scorer: the language model (NgramScorer)
+            codes: the text as alphabetical indices (numpy array)
+        """
+        self.scorer = scorer
+        self.codes = np.array(codes, dtype=np.int64)
+        self.contributions = scorer.table[scorer.indices(self.codes[None])[0]].astype(np.float64)
+        self.total = float(self.contributions.sum())
+
+
+    def deltas(self, trials, positions, letters, count):
+        """
+        Computes how much the score would change under each of several alternative changes
+        (trials) of the text. The changes are given as flat arrays, one entry per changed
+        letter, so that trials can change different numbers of letters. Only the n-grams
+        that contain a changed letter are looked up, so the cost grows with the number of
+        changed letters rather than with the length of the text.
+
+        Parameters:
+            trials: the trial each letter belongs to, 0 to count - 1 (numpy array)
+            positions: the positions of the letters (numpy array)
+            letters: the new letters, as alphabetical indices (numpy array)
+            count: the number of trials (int)
+        Returns: the change of the score for each trial (numpy array)
+        """
+        n = self.scorer.n
+        windows = len(self.contributions)
+        trials = np.asarray(trials, dtype=np.int64)
+        positions = np.asarray(positions, dtype=np.int64)
+        if windows == 0 or len(positions) == 0:
+            return np.zeros(count)
+
+        # the changed letters by trial, then by position, each position once per trial
+        order = np.lexsort((positions, trials))
+        trials, positions = trials[order], positions[order]
+        letters = np.asarray(letters)[order]
+        keep = np.ones(len(positions), dtype=bool)
+        keep[1:] = (trials[1:] != trials[:-1]) | (positions[1:] != positions[:-1])
+        trials, positions, letters = trials[keep], positions[keep], letters[keep]
+
+        # the letters around each changed letter, from n - 1 before it to n - 1 after it
+        # (clipped at the ends of the text; the n-grams that would need them are not counted)
+        offsets = np.arange(-(n - 1), n)
+        around = self.codes[np.clip(positions[:, None] + offsets, 0, len(self.codes) - 1)]
+
+        # with the changed letters of the same trial put in: those close enough to be in
+        # the same n-grams are at most n - 1 changed letters away in the sorted order
+        rows = np.arange(len(positions))
+        for distance in range(-(n - 1), n):
+            other = np.clip(rows + distance, 0, len(positions) - 1)
+            column = positions[other] - positions + n - 1
+            inside = (trials[other] == trials) & (column >= 0) & (column < 2 * n - 1)
+            around[inside, column[inside]] = letters[other[inside]]
+
+        # the n n-grams that contain each changed letter, starting n - 1 letters before it to at it
+        indices = around[:, :n]
+        for i in range(1, n):
+            indices = indices * 26 + around[:, i:i + n]
+        starts = positions[:, None] + offsets[:n]
+
+        # every n-gram is counted once, by the first changed letter in it: a letter counts the
+        # n-grams that start after the previous changed letter of its trial
+        previous = np.full(len(positions), -1)
+        same_trial = trials[1:] == trials[:-1]
+        previous[1:][same_trial] = positions[:-1][same_trial]
+        counted = (starts > previous[:, None]) & (starts >= 0) & (starts < windows)
+
+        differences = np.where(counted, self.scorer.table[indices]
+                               - self.contributions[np.clip(starts, 0, windows - 1)], 0.0)
+        trial = trials
+        differences = differences.sum(axis=1)
+
+        return np.bincount(trial, weights=differences, minlength=count)
+
+
+    def delta(self, positions, letters):
+        """
+        Returns how much the score would change if some letters of the text changed. (float)
+
+        Parameters:
+            positions: the positions of the letters (sequence of int)
+            letters: the new letters, as alphabetical indices (sequence of int)
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        return float(self.deltas(np.zeros(len(positions), dtype=np.int64), positions, letters, 1)[0])
+
+
+    def update(self, positions, letters):
+        """
+        Changes some letters of the text and rescores it.
+
+        Parameters:
+            positions: the positions of the letters (sequence of int)
+            letters: the new letters, as alphabetical indices (sequence of int)
+        Returns: the new score (float)
+        """
+        n = self.scorer.n
+        positions = np.asarray(positions, dtype=np.int64)
+        self.codes[positions] = letters
+
+        # the n-grams that contain a changed letter
+        starts = (positions[:, None] - np.arange(n)).reshape(-1)
+        starts = np.unique(starts[(starts >= 0) & (starts < len(self.contributions))])
+
+        indices = np.zeros(len(starts), dtype=np.int64)
+        for i in range(n):
+            indices = indices * 26 + self.codes[starts + i]
+
+        contributions = self.scorer.table[indices].astype(np.float64)
+        self.total += float(contributions.sum() - self.contributions[starts].sum())
+        self.contributions[starts] = contributions
+
+        return self.total
+
+
+def english_monograms():
+    """
+    Returns a scorer based on the letter frequencies of English text. (NgramScorer)
+    """
+    frequencies = np.array(ENGLISH_FREQUENCIES)
+    return NgramScorer(np.log(frequencies / frequencies.sum()))
+
+
+def main(argv=None):
+    """
+    Entry point: python scoring.py CORPUS DIRECTORY
+    Builds the monogram to quadgram tables of a corpus (a text file) in a directory.
+
+    Parameters:
+        argv: the arguments, default is sys.argv[1:] (list of str)
+    Returns: None
+    """
+    parser = argparse.ArgumentParser(description="Builds n-gram tables for scoring decryptions.")
+    parser.add_argument("corpus", help="a text file in the language of the plaintexts")
+    parser.add_argument("directory", help="the directory the tables are written to")
+    arguments = parser.parse_args(argv)
+
+    with open(arguments.corpus, encoding="utf-8", errors="ignore") as file:
+        corpus = file.read()
+
+    for path in build_tables(corpus, arguments.directory):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+from collections import OrderedDict
+
+
+class ScramblerCache:
+    """
+    Defines:
+        - a bounded cache of scrambler permutations: for a given wiring and set of rotor
+        positions, the rotors and reflector (without the plugboard) map the 26 letters
+        through one fixed permutation, which only has to be worked out once
+        - methods that look permutations up, evicting the least recently used one
+        when the cache is full
+
+    A cache can be shared by any number of machines; permutations are keyed by the
+    wirings as well as the positions, so machines with different rotors do not collide.
+    """
+
+    # a rough upper bound on the memory one entry takes up (key, permutation and bookkeeping)
+    ENTRY_BYTES = 400
+
+    def __init__(self, max_entries=1 << 16):
+        """
+        Constructor. Creates an empty cache.
+
+        Parameters:
+            max_entries: the maximum number of permutations kept, default is 65536,
+                         enough for every position of a 3-rotor wheel order (int)
+        """
+        if not isinstance(max_entries, int):
+            raise TypeError("The maximum number of entries must be an integer.")
+        if max_entries < 1:
+            raise ValueError("The maximum number of entries must be positive.")
+
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+
+    @classmethod
+    def with_memory_budget(cls, budget):
+        """
+        Creates a cache whose entries take up at most roughly <budget> bytes. (ScramblerCache)
+
+        Parameters:
+            budget: the memory budget in bytes (int)
+        """
+        if not isinstance(budget, int):
+            raise TypeError("The memory budget must be an integer.")
+
+        return cls(max(1, budget // cls.ENTRY_BYTES))
+
+
+    def permutation(self, key, build):
+        """
+        Returns the permutation stored under a key, building and storing it if it is missing.
+
+        Parameters:
+            key: the wirings and rotor positions the permutation belongs to (tuple)
+            build: called with no arguments to build a missing permutation (callable)
+        Returns: the encoded letter of each letter A-Z (str of length 26)
+        """
+        entries = self.entries
+        permutation = entries.get(key)
+
+        if permutation is None:
+            self.misses += 1
+            permutation = build()
+            entries[key] = permutation
+            if len(entries) > self.max_entries:
+                # evict the least recently used permutation
+                entries.popitem(last=False)
+        else:
+            self.hits += 1
+            entries.move_to_end(key)
+
+        return permutation
+
+
+    def clear(self):
+        """
+        Removes every permutation from the cache and resets its counters.
+
+        Returns: None
+        """
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+    def __len__(self):
+        """
+        Returns the number of permutations in the cache. (int)
+        """
+        return len(self.entries)
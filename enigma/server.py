@@ -0,0 +1,269 @@
+import argparse
+import asyncio
+import json
+from collections import OrderedDict
+
+from enigma_machine import EnigmaMachine
+
+
+# the number of bytes read from a connection at a time
+READ_SIZE = 1 << 16
+
+# the number of connections waiting to be accepted (many clients may connect at once)
+BACKLOG = 4096
+
+
+class MachinePool:
+    """
+    Defines:
+        - a pool of preconfigured enigma machines, grouped by configuration: a machine
+        is only built the first time a configuration is seen, and every other machine
+        with that configuration is a clone of it that shares its tables
+        - methods that hand out machines at their start key and take them back
+    """
+
+    def __init__(self, max_configs=256, max_idle=64):
+        """
+        Constructor. Creates an empty pool.
+
+        Parameters:
+            max_configs: the number of configurations whose machines are kept, default is 256;
+                         the least recently used configuration is forgotten first (int)
+            max_idle: the number of unused machines kept for each configuration, default is 64 (int)
+        """
+        if not (isinstance(max_configs, int) and isinstance(max_idle, int)):
+            raise TypeError("The sizes of the pool must be integers.")
+        if max_configs < 1 or max_idle < 0:
+            raise ValueError("The pool must keep at least one configuration.")
+
+        self.max_configs = max_configs
+        self.max_idle = max_idle
+
+        # configuration --> (template machine, unused machines)
+        self.configs = OrderedDict()
+
+
+    def acquire(self, config):
+        """
+        Returns a machine with the given configuration, with its rotors at the start key.
+
+        Parameters:
+            config: rotors, reflector, ring settings, initial positions and plugboard pairs,
+                    as given to EnigmaMachine (tuple)
+        Returns: the machine (EnigmaMachine)
+        """
+        key = MachinePool.key(config)
+
+        if key in self.configs:
+            self.configs.move_to_end(key)
+            template, idle = self.configs[key]
+            if idle:
+                return idle.pop()
+            return template.clone()
+
+        # the template is never handed out, so it stays at the start key
+        template = EnigmaMachine(*key[:4], list(key[4]))
+        # build the bulk tables once, for the template and every clone of it
+        template.encode_array([])
+
+        self.configs[key] = (template, [])
+        if len(self.configs) > self.max_configs:
+            self.configs.popitem(last=False)
+
+        return template.clone()
+
+
+    def release(self, machine):
+        """
+        Gives a machine back to the pool, to be reset and handed out again.
+
+        Parameters:
+            machine: a machine returned by acquire (EnigmaMachine)
+        Returns: None
+        """
+        key = MachinePool.key(machine.config())
+
+        # machines of forgotten configurations are dropped
+        if key in self.configs:
+            _, idle = self.configs[key]
+            if len(idle) < self.max_idle:
+                machine.reset()
+                idle.append(machine)
+
+
+    @staticmethod
+    def key(config):
+        """
+        Returns a hashable version of a machine configuration. (tuple)
+
+        Parameters:
+            config: rotors, reflector, ring settings, initial positions and (optionally)
+                    plugboard pairs (tuple or list)
+        """
+        if len(config) not in (4, 5):
+            raise ValueError("A configuration consists of rotors, reflector, ring settings, "
+                             "initial positions and (optionally) plugboard pairs.")
+
+        plugboard_pairs = config[4] if len(config) == 5 else []
+        if not isinstance(plugboard_pairs, list):
+            raise TypeError("Plugboard pairs must be a list.")
+        if not all(isinstance(pair, str) for pair in plugboard_pairs):
+            raise TypeError("Plugboard pairs must be strings.")
+
+        return tuple(config[:4]) + (tuple(pair.upper() for pair in plugboard_pairs),)
+
+
+def parse_handshake(line):
+    """
+    Parses the first line a client sends: a JSON object with the machine's configuration
+    ("rotors", "reflector", "ring_settings", "initial_positions" and optionally
+    "plugboard_pairs") and optionally what to do with bytes that are not letters
+    ("non_letters": "pass", "drop" or "error", see EnigmaMachine.encode_into). The types
+    of the values are checked here, with the messages EnigmaMachine gives for them.
+
+    Parameters:
+        line: the line the client sent (bytes)
+    Returns: the configuration and the non-letter policy (tuple)
+    """
+    try:
+        request = json.loads(line)
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        raise ValueError("The configuration must be a JSON object on a single line.")
+
+    if not isinstance(request, dict):
+        raise ValueError("The configuration must be a JSON object on a single line.")
+
+    try:
+        config = (request["rotors"], request["reflector"], request["ring_settings"],
+                  request["initial_positions"], request.get("plugboard_pairs", []))
+    except KeyError as error:
+        raise ValueError(f"The configuration is missing {error.args[0]}.")
+
+    if not all(isinstance(arg, str) for arg in config[:4]):
+        raise TypeError("Rotors, reflector, ring settings, and initial positions must be strings.")
+    if not isinstance(config[4], list):
+        raise TypeError("Plugboard pairs must be a list.")
+    if not all(isinstance(pair, str) for pair in config[4]):
+        raise TypeError("Plugboard pairs must be strings.")
+
+    non_letters = request.get("non_letters", "pass")
+    if not (isinstance(non_letters, str) and non_letters in ("pass", "drop", "error")):
+        raise ValueError("Non-letters must be passed, dropped or treated as an error.")
+
+    return config, non_letters
+
+
+async def handle_connection(reader, writer, pool):
+    """
+    Serves one connection. The client sends its configuration on the first line (see
+    parse_handshake) and the server answers with "OK" or "ERROR <reason>" on a line of
+    its own. From then on, every byte the client sends is encoded and sent back; the
+    rotors carry on from one read to the next, as if the stream were one message.
+
+    Parameters:
+        reader: the connection's reader (asyncio.StreamReader)
+        writer: the connection's writer (asyncio.StreamWriter)
+        pool: the pool machines are taken from (MachinePool)
+    Returns: None
+    """
+    machine = None
+    try:
+        try:
+            config, non_letters = parse_handshake(await reader.readline())
+            machine = pool.acquire(config)
+        except (TypeError, ValueError, KeyError) as error:
+            message = error.args[0] if error.args else "Invalid configuration."
+            writer.write(f"ERROR {message}\n".encode())
+            await writer.drain()
+            return
+
+        writer.write(b"OK\n")
+        buffer = bytearray(READ_SIZE)
+        output = memoryview(buffer)
+
+        while True:
+            data = await reader.read(READ_SIZE)
+            if not data:
+                break
+
+            try:
+                count = machine.encode_into(data, buffer, non_letters)
+            except ValueError as error:
+                writer.write(f"\nERROR {error.args[0]}\n".encode())
+                break
+
+            # bytes() because the buffer is reused for the next read
+            writer.write(bytes(output[:count]))
+            # stop reading while the client is not keeping up with the output
+            await writer.drain()
+
+        await writer.drain()
+    except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+        pass
+    finally:
+        if machine is not None:
+            pool.release(machine)
+        writer.close()
+        # wait until the connection is closed, so that none are left half-closed under load
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def start_server(host="127.0.0.1", port=8765, path=None, pool=None, backlog=BACKLOG):
+    """
+    Starts an encryption server, listening on a TCP port or, if a path is given, a Unix socket.
+
+    Parameters:
+        host: the address to listen on, default is 127.0.0.1 (str)
+        port: the TCP port to listen on, default is 8765 (int)
+        path: the path of a Unix socket to listen on instead, default is None (str)
+        pool: the pool machines are taken from, default is a new pool (MachinePool)
+        backlog: the number of connections waiting to be accepted, default is 4096 (int)
+    Returns: the server (asyncio.Server)
+    """
+    if pool is None:
+        pool = MachinePool()
+
+    async def handle(reader, writer):
+        await handle_connection(reader, writer, pool)
+
+    if path is not None:
+        return await asyncio.start_unix_server(handle, path=path, backlog=backlog)
+    return await asyncio.start_server(handle, host=host, port=port, backlog=backlog)
+
+
+async def serve(host="127.0.0.1", port=8765, path=None):
+    """
+    Runs an encryption server until it is cancelled (see start_server).
+
+    Returns: None
+    """
+    server = await start_server(host, port, path)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    """
+    Entry point of the server: python server.py [--host HOST] [--port PORT] [--unix PATH]
+
+    Parameters:
+        argv: the arguments, default is sys.argv[1:] (list of str)
+    Returns: None
+    """
+    parser = argparse.ArgumentParser(description="Runs an enigma encryption server.")
+    parser.add_argument("--host", default="127.0.0.1", help="the address to listen on (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=8765, help="the TCP port to listen on (default: %(default)s)")
+    parser.add_argument("--unix", default=None, help="listen on a Unix socket at this path instead")
+    arguments = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(arguments.host, arguments.port, arguments.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import itertools
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from sudoku import DEFAULT_TECHNIQUES, ENGINES, TECHNIQUES, sudoku_solver
+
+
+# the number of puzzles sent to a process at a time
+CHUNK_SIZE = 256
+
+# the number of chunks waiting to be solved for each process, so that the puzzles are read
+# (and the solutions kept) only a little ahead of the ones being handed back
+CHUNKS_PER_WORKER = 4
+
+
+def solve_chunk(puzzles, engine="propagation", techniques=DEFAULT_TECHNIQUES):
+    """
+    Solves a chunk of puzzles in order.
+
+    Parameters:
+        puzzles: the puzzles, empty cells are 0 (numpy array, shape (n, 9, 9))
+        engine: the search used, see sudoku_solver, default is "propagation" (str)
+        techniques: the inference techniques of the propagation engine, see sudoku_solver,
+                    default is DEFAULT_TECHNIQUES (sequence of str)
+
+    Returns: the solutions, all -1 for the puzzles without one (numpy array, shape (n, 9, 9))
+    """
+    solutions = np.empty(puzzles.shape, dtype=int)
+    for i, puzzle in enumerate(puzzles):
+        solutions[i] = sudoku_solver(puzzle, engine, techniques)
+
+    return solutions
+
+
+def chunks(puzzles, chunk_size):
+    """
+    Groups puzzles into chunks.
+
+    Parameters:
+        puzzles: the puzzles (iterable of 9x9 numpy arrays/lists)
+        chunk_size: the number of puzzles in a chunk (the last one may have fewer) (int)
+
+    Returns: a generator of chunks (numpy arrays, shape (n, 9, 9))
+    """
+    # the chunks of an array are slices of it
+    if isinstance(puzzles, np.ndarray):
+        for start in range(0, len(puzzles), chunk_size):
+            yield puzzles[start:start + chunk_size]
+        return
+
+    puzzles = iter(puzzles)
+    while True:
+        chunk = list(itertools.islice(puzzles, chunk_size))
+        if not chunk:
+            return
+
+        chunk = np.asarray(chunk)
+        if chunk.shape[1:] != (9, 9):
+            raise ValueError("Every puzzle must be a 9x9 array.")
+        yield chunk
+
+
+def iter_solutions(puzzles, workers=None, chunk_size=CHUNK_SIZE, engine="propagation",
+                   techniques=DEFAULT_TECHNIQUES):
+    """
+    Solves puzzles with a pool of processes and hands the solutions back in the order of
+    the puzzles. The puzzles are read as the processes need them, so a corpus of any size
+    can be streamed through (e.g. from a file). The arguments are checked straight away,
+    before any puzzle is read.
+
+    Parameters:
+        puzzles: the puzzles, empty cells are 0 (iterable of 9x9 numpy arrays/lists)
+        workers: the number of processes, default is the number of CPUs (int)
+        chunk_size: the number of puzzles sent to a process at a time, default is 256 (int)
+        engine: the search used, see sudoku_solver, default is "propagation" (str)
+        techniques: the inference techniques of the propagation engine, see sudoku_solver,
+                    default is DEFAULT_TECHNIQUES (sequence of str)
+
+    Returns: a generator of solutions (9x9 numpy arrays, all -1 for the puzzles without one)
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if not (isinstance(workers, int) and isinstance(chunk_size, int)):
+        raise TypeError("The number of workers and the chunk size must be integers.")
+    if workers < 1 or chunk_size < 1:
+        raise ValueError("The number of workers and the chunk size must be positive.")
+    if engine not in ENGINES:
+        raise ValueError("The engine must be one of: " + ", ".join(ENGINES) + ".")
+    if any(technique not in TECHNIQUES for technique in techniques):
+        raise ValueError("The techniques must be among: " + ", ".join(TECHNIQUES) + ".")
+
+    return generate_solutions(puzzles, workers, chunk_size, engine, tuple(techniques))
+
+
+def generate_solutions(puzzles, workers, chunk_size, engine, techniques):
+    """
+    The generator behind iter_solutions (see iter_solutions for the parameters).
+
+    Returns: a generator of solutions (9x9 numpy arrays)
+    """
+    if workers == 1:
+        for chunk in chunks(puzzles, chunk_size):
+            yield from solve_chunk(chunk, engine, techniques)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+
+        for chunk in chunks(puzzles, chunk_size):
+            pending.append(executor.submit(solve_chunk, chunk, engine, techniques))
+
+            # hand back the oldest chunk once enough work is queued
+            if len(pending) >= workers * CHUNKS_PER_WORKER:
+                yield from pending.popleft().result()
+
+        while pending:
+            yield from pending.popleft().result()
+
+
+def solve_many(puzzles, workers=None, chunk_size=CHUNK_SIZE, engine="propagation",
+               techniques=DEFAULT_TECHNIQUES):
+    """
+    Solves a corpus of puzzles with a pool of processes.
+
+    Parameters:
+        puzzles: the puzzles, empty cells are 0 (numpy array, shape (N, 9, 9), or an
+                 iterable of 9x9 numpy arrays/lists)
+        workers: the number of processes, default is the number of CPUs (int)
+        chunk_size: the number of puzzles sent to a process at a time, default is 256 (int)
+        engine: the search used, see sudoku_solver, default is "propagation" (str)
+        techniques: the inference techniques of the propagation engine, see sudoku_solver,
+                    default is DEFAULT_TECHNIQUES (sequence of str)
+
+    Returns: the solutions in the order of the puzzles, all -1 for the puzzles without one
+             (numpy array, shape (N, 9, 9)) for an array of puzzles, or a generator of
+             solutions (see iter_solutions) for any other iterable
+    """
+    if not isinstance(puzzles, np.ndarray):
+        return iter_solutions(puzzles, workers, chunk_size, engine, techniques)
+
+    if puzzles.ndim != 3 or puzzles.shape[1:] != (9, 9):
+        raise ValueError("The puzzles must be an array of shape (N, 9, 9).")
+
+    solutions = np.empty(puzzles.shape, dtype=int)
+    for i, solution in enumerate(iter_solutions(puzzles, workers, chunk_size, engine, techniques)):
+        solutions[i] = solution
+
+    return solutions
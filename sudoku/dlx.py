@@ -0,0 +1,275 @@
+import numpy as np
+
+
+# a sudoku as an exact cover problem: each of the 729 (row, column, digit) choices covers
+# 4 of these 324 constraints, and a solution covers each of them exactly once
+CELL, ROW_DIGIT, COLUMN_DIGIT, BOX_DIGIT = 0, 81, 162, 243
+CONSTRAINTS = 324
+
+
+def constraints(row, column, digit):
+    """
+    Returns the constraints covered by placing a digit in a cell.
+
+    Parameters:
+        row, column: the indexes of the cell (0-8)
+        digit: the digit, minus 1 (0-8)
+
+    Returns: the cell, row, column and box constraints (tuple of 4 ints, 0-323)
+    """
+    box = 3 * (row // 3) + column // 3
+    return (CELL + 9 * row + column, ROW_DIGIT + 9 * row + digit,
+            COLUMN_DIGIT + 9 * column + digit, BOX_DIGIT + 9 * box + digit)
+
+
+# the choices, in the order of the rows of the matrix (index 81 * row + 9 * column + digit)
+CHOICES = [(row, column, digit) for row in range(9) for column in range(9) for digit in range(9)]
+
+
+class DancingLinks:
+    """
+    Defines:
+        - an exact cover problem as a sparse 0/1 matrix (Knuth's dancing links): every 1 is a
+        node in a circular doubly linked list of its row and one of its column, and every
+        column has a header with the number of nodes left in it
+        - Algorithm X: a depth first search for a set of rows that covers every column
+        exactly once, which removes (covers) and restores (uncovers) columns by relinking
+        nodes rather than copying anything
+    """
+
+    __slots__ = ("left", "right", "up", "down", "column", "size", "row", "nodes")
+
+    def __init__(self, columns, rows):
+        """
+        Constructor. Builds the links of a matrix.
+
+        Parameters:
+            columns: the number of columns (int)
+            rows: the columns each row has a 1 in (list of sequences of int)
+        """
+        # node 0 is the root, nodes 1 to columns are the column headers
+        headers = columns + 1
+        self.left = [i - 1 for i in range(headers)]
+        self.right = [i + 1 for i in range(headers)]
+        self.left[0], self.right[columns] = columns, 0
+        self.up = list(range(headers))
+        self.down = list(range(headers))
+        self.column = list(range(headers))
+        self.size = [0] * headers
+        # the row each node belongs to (-1 for the headers)
+        self.row = [-1] * headers
+
+        for index, row_columns in enumerate(rows):
+            first = len(self.row)
+            for position, header in enumerate(row_columns):
+                node = first + position
+                header += 1
+
+                # at the bottom of its column
+                self.up.append(self.up[header])
+                self.down.append(header)
+                self.down[self.up[header]] = node
+                self.up[header] = node
+                self.column.append(header)
+                self.size[header] += 1
+
+                # in a circle with the other nodes of its row
+                self.left.append(first + (position - 1) % len(row_columns))
+                self.right.append(first + (position + 1) % len(row_columns))
+                self.row.append(index)
+
+        # the number of search nodes visited so far
+        self.nodes = 0
+
+
+    def copy(self):
+        """
+        Returns a copy of the links, with no search nodes counted. (DancingLinks)
+        """
+        links = DancingLinks.__new__(DancingLinks)
+        links.left = self.left[:]
+        links.right = self.right[:]
+        links.up = self.up[:]
+        links.down = self.down[:]
+        links.size = self.size[:]
+        # these never change
+        links.column = self.column
+        links.row = self.row
+        links.nodes = 0
+
+        return links
+
+
+    def cover(self, header):
+        """
+        Removes a column, and every row with a 1 in it, from the matrix.
+
+        Parameters:
+            header: the column's header node (int)
+
+        Returns: None
+        """
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+
+        right[left[header]] = right[header]
+        left[right[header]] = left[header]
+
+        i = down[header]
+        while i != header:
+            j = right[i]
+            while j != i:
+                down[up[j]] = down[j]
+                up[down[j]] = up[j]
+                size[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+
+    def uncover(self, header):
+        """
+        Puts back a column removed by cover (columns must be put back in the reverse
+        order they were removed in).
+
+        Parameters:
+            header: the column's header node (int)
+
+        Returns: None
+        """
+        left, right, up, down, column, size = self.left, self.right, self.up, self.down, self.column, self.size
+
+        i = up[header]
+        while i != header:
+            j = left[i]
+            while j != i:
+                size[column[j]] += 1
+                down[up[j]] = j
+                up[down[j]] = j
+                j = left[j]
+            i = up[i]
+
+        right[left[header]] = header
+        left[right[header]] = header
+
+
+    def select(self, node):
+        """
+        Adds a row to the solution: covers every column the row has a 1 in.
+
+        Parameters:
+            node: any node of the row (int)
+
+        Returns: None
+        """
+        self.cover(self.column[node])
+        j = self.right[node]
+        while j != node:
+            self.cover(self.column[j])
+            j = self.right[j]
+
+
+    def search(self, solution):
+        """
+        Looks for a set of rows that, together with the rows already in the solution,
+        covers every column exactly once. Branches on the column with the fewest 1s.
+
+        Parameters:
+            solution: the rows chosen so far; the rows found are added to it (list of int)
+
+        Returns: bool, whether a solution was found
+        """
+        self.nodes += 1
+        right, size = self.right, self.size
+
+        # every column is covered
+        if right[0] == 0:
+            return True
+
+        best = right[0]
+        header = right[best]
+        while header != 0 and size[best] > 1:
+            if size[header] < size[best]:
+                best = header
+            header = right[header]
+
+        if size[best] == 0:
+            return False
+
+        self.cover(best)
+
+        i = self.down[best]
+        while i != best:
+            solution.append(self.row[i])
+            j = self.right[i]
+            while j != i:
+                self.cover(self.column[j])
+                j = self.right[j]
+
+            if self.search(solution):
+                return True
+
+            # undo the row's columns in reverse order
+            j = self.left[i]
+            while j != i:
+                self.uncover(self.column[j])
+                j = self.left[j]
+            solution.pop()
+
+            i = self.down[i]
+
+        self.uncover(best)
+        return False
+
+
+# the matrix of an empty sudoku, copied for each puzzle
+SUDOKU_LINKS = DancingLinks(CONSTRAINTS, [constraints(*choice) for choice in CHOICES])
+
+
+def dlx_solver(sudoku, stats=None):
+    """
+    Solves a sudoku as an exact cover problem with dancing links. Same input and output
+    as sudoku_solver.
+
+    Parameters:
+        sudoku: the sudoku, empty cells are 0 (9x9 numpy array)
+        stats: if given, the number of search nodes is added to its "nodes" (dict)
+
+    Returns: the solution (9x9 numpy array), all -1 if there is none
+    """
+    failure = np.full((9, 9), -1)
+    links = SUDOKU_LINKS.copy()
+
+    # the given values are chosen before the search; two of them covering the same
+    # constraint (the same digit twice in a row, column or box) leave no solution
+    solution = []
+    used = set()
+    grid = np.asarray(sudoku).tolist()
+    for row in range(9):
+        for column in range(9):
+            value = grid[row][column]
+            if value == 0:
+                continue
+            if not 1 <= value <= 9:
+                return failure
+
+            covered = constraints(row, column, value - 1)
+            if used.intersection(covered):
+                return failure
+            used.update(covered)
+
+            # the 4 nodes of each choice follow the headers, in the order of choices
+            index = 81 * row + 9 * column + value - 1
+            links.select(CONSTRAINTS + 1 + 4 * index)
+            solution.append(index)
+
+    found = links.search(solution)
+    if stats is not None:
+        stats["nodes"] = stats.get("nodes", 0) + links.nodes
+    if not found:
+        return failure
+
+    result = np.zeros((9, 9), dtype=int)
+    for index in solution:
+        row, column, digit = CHOICES[index]
+        result[row, column] = digit + 1
+
+    return result
@@ -0,0 +1,133 @@
+from array import array
+
+import numpy as np
+
+
+# cells are numbered 0-80, row by row; a set of candidates is a 9-bit mask,
+# where bit d - 1 stands for the digit d
+ALL_DIGITS = 0x1FF
+
+# the row, column and 3x3 submatrix (box) each cell belongs to
+ROW = tuple(cell // 9 for cell in range(81))
+COLUMN = tuple(cell % 9 for cell in range(81))
+BOX = tuple(3 * (cell // 27) + (cell % 9) // 3 for cell in range(81))
+
+# the 20 cells that share a row, column or box with each cell
+PEERS = tuple(tuple(other for other in range(81)
+                    if other != cell and (ROW[other] == ROW[cell] or COLUMN[other] == COLUMN[cell]
+                                          or BOX[other] == BOX[cell]))
+              for cell in range(81))
+
+# the cells of each row, column and box (the 27 units that must each contain every digit once)
+UNITS = (tuple(tuple(cell for cell in range(81) if ROW[cell] == i) for i in range(9))
+         + tuple(tuple(cell for cell in range(81) if COLUMN[cell] == i) for i in range(9))
+         + tuple(tuple(cell for cell in range(81) if BOX[cell] == i) for i in range(9)))
+
+# where each box meets each row and column crossing it:
+# (the 3 shared cells, the other 6 cells of the row/column, the other 6 cells of the box)
+INTERSECTIONS = tuple((tuple(cell for cell in line if cell in box),
+                       tuple(cell for cell in line if cell not in box),
+                       tuple(cell for cell in box if cell not in line))
+                      for box in UNITS[18:] for line in UNITS[:18]
+                      if any(cell in box for cell in line))
+
+# the number of candidates in each mask
+POPCOUNT = bytes(bin(mask).count("1") for mask in range(ALL_DIGITS + 1))
+
+
+class SudokuState:
+    """
+    Defines:
+        - the state of a sudoku being solved, in a fixed amount of memory: a 9-bit mask of
+        the candidates of each cell, the digit placed in each cell (0 if there is none yet),
+        and a mask of the digits used in each row, column and box
+        - methods that place digits, save the state and restore it in place (so that a search
+        can backtrack without building a new state for every value it tries), and convert the
+        state to and from 9x9 grids
+    """
+
+    __slots__ = ("candidates", "values", "rows", "columns", "boxes", "empty")
+
+    def __init__(self):
+        """
+        Constructor. Creates an empty sudoku: every cell can take every digit.
+        """
+        self.candidates = array("H", [ALL_DIGITS]) * 81
+        self.values = bytearray(81)
+        self.rows = array("H", [0]) * 9
+        self.columns = array("H", [0]) * 9
+        self.boxes = array("H", [0]) * 9
+        # the number of cells with no digit placed
+        self.empty = 81
+
+
+    @classmethod
+    def from_grid(cls, sudoku):
+        """
+        Creates the state of a sudoku, with the candidates of the cells whose values are given
+        narrowed down to that value (the values still have to be placed, see place).
+
+        Parameters:
+            sudoku: the sudoku, empty cells are 0 (9x9 numpy array/list)
+
+        Returns: the state (SudokuState), or None if a value is not a digit 0-9
+        """
+        state = cls()
+
+        for cell, value in enumerate(np.asarray(sudoku).reshape(-1).tolist()):
+            if not 0 <= value <= 9:
+                return None
+            if value:
+                state.candidates[cell] = 1 << (value - 1)
+
+        return state
+
+
+    def save(self):
+        """
+        Returns a copy of everything that changes as digits are placed, for restore. (tuple)
+        """
+        return (self.candidates[:], self.values[:], self.rows[:], self.columns[:], self.boxes[:], self.empty)
+
+
+    def restore(self, saved):
+        """
+        Puts the state back the way it was when it was saved, overwriting it in place.
+
+        Parameters:
+            saved: what save returned (tuple)
+
+        Returns: None
+        """
+        self.candidates[:], self.values[:], self.rows[:], self.columns[:], self.boxes[:], self.empty = saved
+
+
+    def place(self, cell, bit):
+        """
+        Places a digit in a cell, if the digit is not used in the cell's row, column or box yet.
+
+        Parameters:
+            cell: the cell, 0-80 (int)
+            bit: the digit, as a mask with a single bit (int)
+
+        Returns: bool, whether the digit could be placed
+        """
+        row, column, box = ROW[cell], COLUMN[cell], BOX[cell]
+        if (self.rows[row] | self.columns[column] | self.boxes[box]) & bit:
+            return False
+
+        self.rows[row] |= bit
+        self.columns[column] |= bit
+        self.boxes[box] |= bit
+        self.candidates[cell] = bit
+        self.values[cell] = bit.bit_length()
+        self.empty -= 1
+
+        return True
+
+
+    def to_grid(self):
+        """
+        Returns the digits placed so far, 0 in the empty cells. (9x9 numpy array)
+        """
+        return np.frombuffer(bytes(self.values), dtype=np.uint8).astype(int).reshape(9, 9)
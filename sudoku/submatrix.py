@@ -0,0 +1,4 @@
+# dictionary of the 3x3 submatrix each index in a 9x9 sudoku belongs to
+# (i, j) --> ((first row, last row), (first column, last column))
+submatrix = {(i, j): ((3 * (i // 3), 3 * (i // 3) + 2), (3 * (j // 3), 3 * (j // 3) + 2))
+             for i in range(9) for j in range(9)}
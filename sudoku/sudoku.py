@@ -1,20 +1,61 @@
-import random 
-import copy
+import itertools
+
+import numpy as np
+
+from dlx import dlx_solver
+from state import ALL_DIGITS, INTERSECTIONS, PEERS, POPCOUNT, UNITS, SudokuState
 from submatrix import submatrix
 
-def sudoku_solver(sudoku):
+# the ways sudoku_solver can solve a puzzle: constraint propagation with depth first
+# search, or dancing links (an exact cover search, see dlx.py)
+ENGINES = ("propagation", "dlx")
+
+# the inference techniques the propagation engine can apply on top of naked singles
+# (removing a placed digit from its peers, which is always applied), cheapest first
+TECHNIQUES = ("hidden_singles", "pointing", "claiming", "naked_subsets", "hidden_subsets")
+
+# the techniques used unless others are chosen (on the benchmark corpus, subsets cut the
+# number of search nodes further but cost more time than they save)
+DEFAULT_TECHNIQUES = ("hidden_singles", "pointing", "claiming")
+
+# the sizes of the naked and hidden subsets looked for (pairs and triples)
+SUBSET_SIZES = (2, 3)
+
+def sudoku_solver(sudoku, engine="propagation", techniques=DEFAULT_TECHNIQUES, stats=None):
     """
     Solves a Sudoku puzzle and returns its unique solution.
 
     Input
         sudoku : 9x9 numpy array
             Empty cells are designated by 0.
+        engine : str, one of ENGINES
+            The search used, "propagation" (the default) or "dlx".
+        techniques : sequence of str, from TECHNIQUES
+            The inference techniques the propagation engine applies at every search node,
+            on top of naked singles. Default is DEFAULT_TECHNIQUES.
+        stats : dict
+            If given, the number of search nodes ("nodes") and, for the propagation engine,
+            the number of candidates each technique removed are added to it.
 
     Output
         9x9 numpy array of integers
             It contains the solution, if there is one. If there is no solution, all array entries should be -1.
     """
     
+    if engine not in ENGINES:
+        raise ValueError("The engine must be one of: " + ", ".join(ENGINES) + ".")
+    if any(technique not in TECHNIQUES for technique in techniques):
+        raise ValueError("The techniques must be among: " + ", ".join(TECHNIQUES) + ".")
+    if stats is None:
+        stats = {}
+    if engine == "dlx":
+        return dlx_solver(sudoku, stats)
+    
+    # apply the techniques in the order of TECHNIQUES (cheapest first)
+    techniques = [technique for technique in TECHNIQUES if technique in techniques]
+    for key in ["nodes"] + techniques:
+        stats.setdefault(key, 0)
+    
     # dictionary of the 3x3 submatrix each index in a 9x9 sudoku belongs to
     SUBMATRIX = submatrix
     
@@ -23,52 +64,27 @@ def sudoku_solver(sudoku):
         array = np.full((9,9), -1)
         return array
     
-    # find indices in the initial state of the sudoku which are 0 (values we must fill in)
-    indices = np.argwhere(sudoku == 0) 
-    # convert the numpy arrays to lists
-    indices = indices.tolist()
-        
-    # create a list of possible values mirroring the sudoku's initial state
-    possible_values = sudoku.tolist() 
-    
-    # replace every index in possible_values that contains a 0 with the list of all possible values (0-9)
-    for i in range(len(indices)):
-        x = indices[i][0]
-        y = indices[i][1]
-        possible_values[x][y] = [1, 2, 3, 4, 5, 6, 7, 8, 9] 
-        
-    # stores how many possible values there are at each index with an undetermined value
-    indices_dict = {}
-    
-    # add all indices that have undetermined values to the dictionary
-    for i in range(len(indices)):
-        x = indices[i][0]
-        y = indices[i][1]
-        # initially, all undetermined indices have 9 possible values (1-9)
-        indices_dict[(x, y)] = 9 
-        
+    # the candidates of every cell as bit masks, narrowed down to the given value where there is one
+    state = SudokuState.from_grid(sudoku)
+    if state is None:
+        return np.full((9,9), -1)
     
-    # apply constraints to initial state
-    for i in range(9):
-        for j in range(9):
-            # only apply constraints for a specific index if it has an undetermined value
-            if not(type(possible_values[i][j]))==list: 
-                apply_constraints(i, j, possible_values, SUBMATRIX, indices_dict)
-        
+    # apply constraints to initial state: place the given values and remove them from their peers
+    for cell in range(81):
+        if POPCOUNT[state.candidates[cell]] == 1 and not state.values[cell]:
+            if not apply_constraints(cell, state):
+                return np.full((9,9), -1)
     
-    # if applying constraints alone has not solved the sudoku
-    if len(indices_dict.keys())!=0:
-        possible_values = dfs(possible_values, SUBMATRIX, indices_dict, root=True)
+    if not propagate(state, techniques, stats):
+        return np.full((9,9), -1)
     
-    # convert possible_values back into a numpy array
-    arr = np.array(possible_values)
+    # if applying constraints alone has not solved the sudoku
+    if not is_goal_state(state):
+        state = dfs(state, techniques, stats)
+        if state is None:
+            return np.full((9,9), -1)
     
-    # check if the final state is valid
-    if not is_valid(possible_values, SUBMATRIX):
-        array = np.full((9,9), -1)
-        return array
-    else: 
-        return arr
+    return state.to_grid()
 
         
 def is_valid(sudoku, SUBMATRIX):
@@ -115,276 +131,386 @@ def is_valid(sudoku, SUBMATRIX):
     return True
 
 
-def is_valid_single(i, j, sudoku, SUBMATRIX):
+def is_goal_state(state):
     """
-    Checks if a given sudoku state is valid (has no duplicates in the same row,
-    column or 3x3 sub-matrix). It runs checks for a specific element located at
-    index [i][j]
+    Checks if a given sudoku state is the goal state: every cell has a digit. (Digits are only
+    placed where they do not clash with the rest of the state, so it is also valid.)
     
     Parameters:
-        sudoku: the sudoku state (9x9 numpy array/list)
-        SUBMATRIX: a dictionary containing the 3x3 submatrices each index in a 9x9
-                   sudoku belongs to
-    
+        state: the sudoku state (SudokuState)
+        
     Returns: bool
     """
     
-    value = sudoku[i][j]
-                  
-    # DUPLICATES IN ROWS AND COLUMNS
-    for k in range(9):
-                
-        # if there is a duplicate in the same row
-        if sudoku[i][k]==value:
-            # if the duplicate isn't in the same position as the value
-            if k!=j: return False
-                        
-        # if there is a duplicate in the same column
-        if sudoku[k][j]==value:
-            if k!=i: return False
-            
-    # DUPLICATES IN 3X3 SUBMATRICES
-    for m in range(SUBMATRIX[(i, j)][0][0], SUBMATRIX[(i, j)][0][1]+1):
-        for n in range(SUBMATRIX[(i, j)][1][0], SUBMATRIX[(i, j)][1][1]+1):
-                    
-            # if there is a duplicate in the same 3x3 sub-matrix
-            if sudoku[m][n]==value:
-                # if the duplicate isn't in the same position as the value
-                if m!=i and n!=j: return False
-                        
-    return True
+    return state.empty == 0
+    
 
+def least_possible_values(state):
+    """
+    Heuristic that determines the cell at which there are the least possible branches.
+    
+    Parameters:
+        state: the sudoku state (SudokuState)
+                       
+    Returns: the cell (0-80) with no digit placed and the fewest candidates, -1 if there is none
+    """
+    
+    candidates = state.candidates
+    values = state.values
+    
+    # initialize the minimum value at something absurdly high
+    min_amount = 10
+    min_cell = -1
+    
+    for cell in range(81):
+        if not values[cell]:
+            amount = POPCOUNT[candidates[cell]]
+            if amount < min_amount:
+                min_amount = amount
+                min_cell = cell
+                # a cell with 2 candidates is as good as it gets
+                if amount == 2: break
 
-def is_goal_state(sudoku, SUBMATRIX):
+    return min_cell
+        
+    
+def apply_constraints(cell, state):
     """
-    Checks if a given sudoku state is the goal state.
+    Places the digit of a cell whose candidates have been narrowed down to one, and removes it
+    from the candidates of the cell's peers (its row, column and 3x3 submatrix). Peers that
+    are left with a single candidate are placed in turn: they are kept on a stack rather
+    than handled by recursion.
     
     Parameters:
-        sudoku: the sudoku state (9x9 numpy array/list)
-        SUBMATRIX: a dictionary containing the 3x3 submatrices each index in a 9x9
-                   sudoku belongs to
+        cell: the cell (0-80) whose digit we are adding to the sudoku
+        state: the sudoku state (SudokuState)
+
+    Returns: False if a contradiction was found (a digit used twice in a row, column or
+             submatrix, or a cell with no candidates left), True otherwise
+    """
+    
+    candidates = state.candidates
+    stack = [cell]
+    
+    while stack:
+        cell = stack.pop()
+        bit = candidates[cell]
         
-    Returns: bool
+        if not state.place(cell, bit):
+            return False
+        
+        for peer in PEERS[cell]:
+            mask = candidates[peer]
+            # placed peers have a different digit (place checked), so only open cells match
+            if mask & bit:
+                mask ^= bit
+                candidates[peer] = mask
+                
+                if not mask:
+                    return False
+                # cells left with one candidate are placed next
+                if POPCOUNT[mask] == 1:
+                    stack.append(peer)
+    
+    return True
+    
+    
+def eliminate(cell, bits, state):
     """
+    Removes candidates from a cell. If a single candidate is left, it is placed (see
+    apply_constraints).
+    
+    Parameters:
+        cell: the cell (0-80)
+        bits: the candidates to remove, as a mask
+        state: the sudoku state (SudokuState)
     
-    # first check if the sudoku is valid
-    if not is_valid(sudoku, SUBMATRIX): return False
+    Returns: the number of candidates removed, or -1 if a contradiction was found
+    """
     
-    # if it is valid, check if any of its values are undetermined
-    else:
-        for i in range(9):
-            for j in range(9):
-                if type(sudoku[i][j]) == list: return False
-        return True
+    mask = state.candidates[cell]
+    removed = mask & bits
+    if not removed:
+        return 0
     
+    mask ^= removed
+    if not mask:
+        return -1
+    
+    state.candidates[cell] = mask
+    if POPCOUNT[mask] == 1 and not apply_constraints(cell, state):
+        return -1
+    
+    return POPCOUNT[removed]
+
 
-def least_possible_values(indices_dict):
+def hidden_singles(state):
     """
-    Heuristic that determines the index at which there are the least possible branches.
+    Places every digit that only one open cell of a row, column or 3x3 submatrix can take.
     
     Parameters:
-         indices_dict: keys: tuples containing pairs of i,j indices whose values are
-                        undetermined
-                       values: number of possible values index the index i,j can take
-                       
-    Returns: tuple (i, j) if a minimum is found, -1 otherwise
+        state: the sudoku state (SudokuState)
+    
+    Returns: the number of candidates removed, or -1 if a contradiction was found
     """
     
-    # initialize the minimum value at something absurdly high
-    min_amount = 9999
-    min_key = None
-    
-    for key in indices_dict.keys():
-        # if the number of values a specific index can take is 1 (abnormal), 
-        # disregard this element, since its value is already determined
-        if indices_dict[key] < min_amount and indices_dict[key]!=1:
-            min_amount = indices_dict[key]
-            min_key = key
-
-    # if no minimum is found, return -1
-    if min_key is None: return -1
-    else: return min_key
+    candidates = state.candidates
+    values = state.values
+    removed = 0
+    
+    for unit in UNITS:
+        # digits that are candidates of at least one open cell, and of at least two
+        once = twice = placed = 0
+        for cell in unit:
+            mask = candidates[cell]
+            if values[cell]:
+                placed |= mask
+            else:
+                twice |= once & mask
+                once |= mask
         
-    
-def apply_constraints(i, j, possible_values, SUBMATRIX, indices_dict):
+        # a digit that no cell of the unit can take
+        if (once | placed) != ALL_DIGITS:
+            return -1
+        
+        singles = once & ~twice
+        if not singles:
+            continue
+        
+        for cell in unit:
+            mask = candidates[cell]
+            if not values[cell] and mask & singles:
+                bit = mask & singles
+                # two digits that can only go in the same cell
+                if POPCOUNT[bit] > 1:
+                    return -1
+                removed += POPCOUNT[mask] - 1
+                candidates[cell] = bit
+                if not apply_constraints(cell, state):
+                    return -1
+    
+    return removed
+
+
+def intersections(state, pointing):
     """
-    Used to update possible values for rows, columns, and 3x3 submatrices
-    when a new value is added to the sudoku.
+    Pointing: when the open cells of a 3x3 submatrix that can take a digit all lie in one
+    row or column, the digit is removed from the rest of that row or column.
+    Claiming (box-line reduction): when the open cells of a row or column that can take a
+    digit all lie in one 3x3 submatrix, the digit is removed from the rest of that submatrix.
     
     Parameters:
-        i, j: the indexes of the value we are adding in the sudoku
-        possible_values: a list that mirrors the sudoku--at indexes where
-                         values have been determined, it contains the values.
-                         at indexes with undetermined values, it contains a
-                         list of possible values.
-        SUBMATRIX: a dictionary containing the 3x3 submatrices each index in
-                   a 9x9 sudoku belongs to
-        indices_dict: keys: tuples containing pairs of i,j indices whose values are
-                            undetermined
-                      values: number of possible values index the index i,j can take
-
-    Returns: None
-    """
+        state: the sudoku state (SudokuState)
+        pointing: True for pointing, False for claiming (bool)
     
-    # the value for which we will apply constraints
-    value = possible_values[i][j]
+    Returns: the number of candidates removed, or -1 if a contradiction was found
+    """
     
-    # DUPLICATES IN ROWS #
-    for k in range(9):
+    candidates = state.candidates
+    removed = 0
+    
+    for shared, line, box in INTERSECTIONS:
+        inside = candidates[shared[0]] | candidates[shared[1]] | candidates[shared[2]]
+        line_rest = 0
+        for cell in line:
+            line_rest |= candidates[cell]
+        box_rest = 0
+        for cell in box:
+            box_rest |= candidates[cell]
         
-        if possible_values is None:
-            return None
+        # digits of the intersection that the rest of the box (or line) cannot take
+        # must be in the intersection, so the rest of the line (or box) cannot take them
+        if pointing:
+            bits, targets = inside & ~box_rest & line_rest, line
+        else:
+            bits, targets = inside & ~line_rest & box_rest, box
         
-        # if index i,k contains a list and the value is in the list
-        if type(possible_values[i][k])==list and (value in possible_values[i][k]):
-            
-            # remove the value from possibilities- rows
-            possible_values[i][k].remove(value)
-            
-            # decrement the number of possible values at index i,k
-            indices_dict[(i,k)] -= 1
+        if bits:
+            for cell in targets:
+                count = eliminate(cell, bits, state)
+                if count < 0:
+                    return -1
+                removed += count
+    
+    return removed
 
-            # turn lists of length 1 into numbers
-            if len(possible_values[i][k])==1: 
-                possible_values[i][k] = possible_values[i][k][0]
 
-                # remove key with index i,k from the dictionary
-                indices_dict.pop((i, k))
+def pointing(state):
+    """
+    Pointing (see intersections).
+    """
+    
+    return intersections(state, True)
 
-                # recurse when a value is determined
-                apply_constraints(i, k, possible_values, SUBMATRIX, indices_dict) 
 
+def claiming(state):
+    """
+    Claiming (see intersections).
+    """
     
-    # DUPLICATES IN COLUMNS #
- 
-    for l in range(9):
-        
-        # if index l,j contains a list and the value is in the list    
-        if type(possible_values[l][j])==list and (value in possible_values[l][j]):
-            
-            # remove already used value from possibilities- columns
-            possible_values[l][j].remove(value)
-            # decrement the number of possible values at index l,j
-            indices_dict[(l,j)] -= 1
-                
-            # turn lists of length 1 into numbers
-            if len(possible_values[l][j])==1:
-                possible_values[l][j] = possible_values[l][j][0]
+    return intersections(state, False)
 
-                # remove key with index i,k from the dictionary
-                indices_dict.pop((l, j))
-                
-                # recurse when a value is determined
-                apply_constraints(l, j, possible_values, SUBMATRIX, indices_dict)
+
+def naked_subsets(state):
+    """
+    Naked subsets: when k open cells of a row, column or 3x3 submatrix can only take the same
+    k digits between them, no other cell of the unit can take those digits.
     
+    Parameters:
+        state: the sudoku state (SudokuState)
     
-    # DUPLICATES IN 3X3 SUBMATRICES #               
-
-    for m in range(SUBMATRIX[(i, j)][0][0], SUBMATRIX[(i, j)][0][1]+1):
-        for n in range(SUBMATRIX[(i, j)][1][0], SUBMATRIX[(i, j)][1][1]+1):
+    Returns: the number of candidates removed, or -1 if a contradiction was found
+    """
+    
+    candidates = state.candidates
+    values = state.values
+    removed = 0
+    
+    for unit in UNITS:
+        for size in SUBSET_SIZES:
+            cells = [cell for cell in unit if not values[cell] and POPCOUNT[candidates[cell]] <= size]
             
-            # if index l,j contains a list and the value is in the list    
-            if type(possible_values[m][n])==list  and (value in possible_values[m][n]):
-                
-                # remove already used value from possibilities- submatrices
-                possible_values[m][n].remove(value) 
-                 # decrement the number of possible values at index m,n
-                indices_dict[(m,n)] -= 1
+            for subset in itertools.combinations(cells, size):
+                bits = 0
+                for cell in subset:
+                    bits |= candidates[cell]
+                if POPCOUNT[bits] != size:
+                    continue
                 
-                # turn lists of length 1 into numbers
-                if len(possible_values[m][n])==1:
-                    possible_values[m][n] = possible_values[m][n][0]
+                for cell in unit:
+                    if cell not in subset and not values[cell]:
+                        count = eliminate(cell, bits, state)
+                        if count < 0:
+                            return -1
+                        removed += count
+    
+    return removed
 
-                    # remove key with index m,n from the dictionary
-                    indices_dict.pop((m, n))
-                    
-                    # recurse when a value is determined
-                    apply_constraints(m, n, possible_values, SUBMATRIX, indices_dict)
-                    
-                    
-def make_indices_dict(possible_values):
+
+def hidden_subsets(state):
     """
-    Creates an indices dict for a specific sudoku state. An indices dict contains:
-        keys: tuples containing pairs of i,j indices whose values are undetermined
-        values: number of possible values index the index i,j can take
-                      
+    Hidden subsets: when k digits can only go in the same k open cells of a row, column or
+    3x3 submatrix between them, those cells cannot take any other digit.
+    
     Parameters:
-        possible_values: the sudoku state (9x9 numpy array/list)
+        state: the sudoku state (SudokuState)
+    
+    Returns: the number of candidates removed, or -1 if a contradiction was found
+    """
+    
+    candidates = state.candidates
+    values = state.values
+    removed = 0
+    
+    for unit in UNITS:
+        # the positions in the unit (as a mask) of the open cells that can take each digit
+        places = [0] * 9
+        for position, cell in enumerate(unit):
+            if not values[cell]:
+                mask = candidates[cell]
+                for digit in range(9):
+                    if mask >> digit & 1:
+                        places[digit] |= 1 << position
         
-    Returns: dict
+        for size in SUBSET_SIZES:
+            digits = [digit for digit in range(9) if 0 < POPCOUNT[places[digit]] <= size]
+            
+            for subset in itertools.combinations(digits, size):
+                positions = bits = 0
+                for digit in subset:
+                    positions |= places[digit]
+                    bits |= 1 << digit
+                if POPCOUNT[positions] != size:
+                    continue
+                
+                for position, cell in enumerate(unit):
+                    if positions >> position & 1:
+                        count = eliminate(cell, ALL_DIGITS ^ bits, state)
+                        if count < 0:
+                            return -1
+                        removed += count
+    
+    return removed
+
+
+# technique --> the function that applies it to a state
+TECHNIQUE_FUNCTIONS = {
+    "hidden_singles": hidden_singles,
+    "pointing": pointing,
+    "claiming": claiming,
+    "naked_subsets": naked_subsets,
+    "hidden_subsets": hidden_subsets,
+}
+
+
+def propagate(state, techniques, stats):
     """
+    Applies inference techniques until none of them removes any more candidates. Whenever
+    one does, the cheaper ones are tried again first.
     
-    indices_dict = {}
+    Parameters:
+        state: the sudoku state (SudokuState)
+        techniques: the names of the techniques, cheapest first (list of str)
+        stats: technique --> number of candidates it removed, updated (dict)
     
-    for i in range(9):
-        for j in range(9):
-            # get all the indices which contain lists = have undetermined values
-            if type(possible_values[i][j])==list:
-                indices_dict[(i, j)]= len(possible_values[i][j])
-                
-    if not indices_dict: return None
-    else: return indices_dict
+    Returns: False if a contradiction was found, True otherwise
+    """
     
+    i = 0
+    while i < len(techniques) and state.empty:
+        removed = TECHNIQUE_FUNCTIONS[techniques[i]](state)
+        if removed < 0:
+            return False
+        
+        if removed:
+            stats[techniques[i]] += removed
+            i = 0
+        else:
+            i += 1
     
-def dfs(possible_values, SUBMATRIX, indices_dict, root=True):
+    return True
+
+
+def dfs(state, techniques=(), stats=None):
     """
-    Runs a DFS on a sudoku state. 
+    Runs a DFS on a sudoku state. The state is changed in place: it is saved once, and
+    restored after every value that does not lead to a solution.
     
     Parameters:
-        possible_values: the sudoku state (9x9 numpy array/list)
-        SUBMATRIX: a dictionary containing the 3x3 submatrices each index in
-                   a 9x9 sudoku belongs to
-        indices_dict: keys: tuples containing pairs of i,j indices whose values are
-                            undetermined
-                      values: number of possible values index the index i,j can take
-        root: (optional--defaults to True) bool used to determine whether the function
-              currently running is a recursive call
+        state: the sudoku state, with constraints applied (SudokuState)
+        techniques: the inference techniques applied after each value is set, on top of
+                    naked singles, cheapest first (list of str)
+        stats: the number of search nodes ("nodes") and of candidates each technique
+               removed, updated (dict)
               
-    Returns: a goal state (solved sudoku) if a solution exists, a 9x9 numpy array filled
-             with -1s otherwise    
+    Returns: the state, solved, if a solution exists; None (with the state as it was given) otherwise
     """
     
-    # get the index [i][j] of the sudoku state that has the least possible values
-    min_key = least_possible_values(indices_dict)
-    # get the list of possible values at that index
-    values_list = possible_values[min_key[0]][min_key[1]]
+    if stats is None:
+        stats = dict.fromkeys(["nodes"] + list(techniques), 0)
+    stats["nodes"] += 1
     
-    # iterate through the possible values
-    for value in values_list:
-        
-        # create a deep copy of the current sudoku state
-        new_possible_values = copy.deepcopy(possible_values)
-        # set one of the values
-        new_possible_values[min_key[0]][min_key[1]] = value
+    # get the cell of the sudoku state that has the least possible values
+    cell = least_possible_values(state)
+    mask = state.candidates[cell]
+    # the state to go back to after each value
+    saved = state.save()
+    
+    # iterate through the possible values (the bits of the mask, lowest first)
+    while mask:
+        bit = mask & -mask
+        mask ^= bit
         
-        # if the state is invalid when the value is set, continue
-        if not is_valid_single(min_key[0], min_key[1], new_possible_values, SUBMATRIX): continue
+        # set one of the values, and apply constraints to the rest of the state
+        state.candidates[cell] = bit
+        if apply_constraints(cell, state) and propagate(state, techniques, stats):
             
-        # make a new indices dict for the current state
-        indices_dict = make_indices_dict(new_possible_values)
-        
-        # apply constraints to the rest of the state
-        apply_constraints(min_key[0], min_key[1], new_possible_values, SUBMATRIX, indices_dict)
-
-        # if the current state is the goal state, return it
-        if is_goal_state(new_possible_values, SUBMATRIX): 
-            return new_possible_values
+            # if the current state is the goal state, or leads to it, return it
+            if is_goal_state(state) or dfs(state, techniques, stats) is not None:
+                return state
         
-        else:
-            # make a new indices dict for the state after constraint propagation
-            new_indices_dict = make_indices_dict(new_possible_values)
-            
-            # if the dict is not empty
-            if new_indices_dict is not None: 
-                
-                # call dfs on the state
-                rec = dfs(new_possible_values, SUBMATRIX, new_indices_dict, root=False)
-                #if recursion finds the goal state, return it
-                if is_goal_state(rec, SUBMATRIX): return rec
-                else: continue
-    
-    # if we don't find a solution at the root, return the 9x9 full of -1s
-    if root: return np.full((9,9), -1)
-    # if we don't find a solution in one of the intermediate stages, return the unedited state
-    else: return possible_values
-        
\ No newline at end of file
+        # otherwise undo everything the value changed
+        state.restore(saved)
+    
+    # no value leads to a solution
+    return None